@@ -0,0 +1,29 @@
+"""
+Подготовка окружения для бенчмарков.
+src.config читает .env из текущей директории, поэтому бенчмарки работают
+во временной директории с минимальной .env и собственной БД.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_env(**overrides: str) -> Path:
+    """Создаёт временную директорию с .env, переходит в неё и добавляет проект в sys.path."""
+    workdir = Path(tempfile.mkdtemp(prefix="rdpbot-bench-"))
+    values = {
+        "TELEGRAM_BOT_TOKEN": "123456:bench-token",
+        "ADMIN_TELEGRAM_ID": "1",
+        "PASSWORD_HASH_SECRET": "bench-secret",
+        "DB_NAME": str(workdir / "bench.db"),
+        "SSH_HOST": "127.0.0.1",  # Обязателен в конфигурации; бенчмарки без SSH к нему не подключаются
+    }
+    values.update(overrides)
+    (workdir / ".env").write_text("".join(f"{k}={v}\n" for k, v in values.items()), encoding="utf-8")
+    os.chdir(workdir)
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    return workdir
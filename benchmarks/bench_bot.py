@@ -0,0 +1,174 @@
+"""
+Сквозной офлайн-бенчмарк: настоящий бот (main.py в отдельном процессе) против
+заглушек Telegram Bot API (fake_telegram) и сервера сессий (fake_ssh).
+
+Каждый синтетический пользователь заранее зарегистрирован и одобрен в БД. Он
+выполняет /start и /login, затем несколько раундов: кнопка «Перезапуск»,
+/restart <пользователь на сервере> (до результата перезапуска, а не
+ответа «в очереди»), кнопка «Вход». Следующее действие
+отправляется после ответа бота (обновления основного сообщения), поэтому
+задержка действия — от отдачи обновления боту до этого ответа.
+Выводятся p50/p95/p99 по видам действий, пропускная способность и число
+вызовов Bot API и команд SSH.
+
+Правки основного сообщения ограничены EDIT_CHAT_INTERVAL (по умолчанию 1 с на
+чат), поэтому задержки подряд идущих действий одного пользователя включают это
+ожидание. Чтобы измерить только работу бота: --set EDIT_CHAT_INTERVAL=0 EDIT_DEBOUNCE=0
+
+Запуск: python benchmarks/bench_bot.py [--users 20] [--rounds 3] [--ssh-latency 0.05]
+        [--api-latency 0.01] [--set КЛЮЧ=ЗНАЧЕНИЕ ...]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from _env import ROOT, setup_env
+from fake_ssh import FakeSSHServer
+from fake_telegram import FakeBotAPI
+
+TOKEN = "123456:bench-token"
+ADMIN_ID = 1
+FIRST_USER_ID = 1000
+PASSWORD = "bench-pass"
+ACTION_TIMEOUT = 30
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк бота с заглушками Bot API и SSH")
+    parser.add_argument("--users", type=int, default=20, help="синтетических пользователей")
+    parser.add_argument("--rounds", type=int, default=3, help="раундов меню + /restart на пользователя")
+    parser.add_argument("--ssh-latency", type=float, default=0.05, help="задержка команды SSH, с")
+    parser.add_argument("--ssh-connect-latency", type=float, default=0.1, help="задержка SSH-аутентификации, с")
+    parser.add_argument("--api-latency", type=float, default=0.01, help="задержка ответа Bot API, с")
+    parser.add_argument("--set", nargs="*", default=[], metavar="КЛЮЧ=ЗНАЧЕНИЕ",
+                        help="параметры .env бота, например UPDATE_CONCURRENCY=1")
+    return parser.parse_args()
+
+
+def seed_users(count: int):
+    """Регистрирует и одобряет пользователей в БД бенчмарка (до запуска бота)."""
+    from src.config import config
+    from src.db import utils
+    from src.db.hashing import hash_password
+
+    utils.init_db()
+    salt = "00" * 16
+    password_hash = hash_password(PASSWORD, salt, config.PASSWORD_HASH_SECRET)
+    for i in range(count):
+        telegram_id = FIRST_USER_ID + i
+        utils.add_bot_user(telegram_id, f"bench{i}", password_hash, salt)
+        utils.approve_user(telegram_id)
+    utils.close_db_connections()
+
+
+async def run_user(api: FakeBotAPI, index: int, rounds: int, latencies: dict[str, list[float]],
+                   failures: dict[str, int]):
+    user_id = FIRST_USER_ID + index
+    menu: dict | None = None
+
+    async def act(name: str, send, accept=None):
+        nonlocal menu
+        response = api.next_menu(user_id, accept)
+        started = time.perf_counter()
+        send()
+        try:
+            menu = await asyncio.wait_for(response, ACTION_TIMEOUT)
+        except asyncio.TimeoutError:
+            failures[name] += 1
+            return
+        latencies[name].append(time.perf_counter() - started)
+
+    await act("start", lambda: api.push_command(user_id, "/start"))
+    await act("login", lambda: api.push_command(user_id, f"/login bench{index} {PASSWORD}"))
+    for _ in range(rounds):
+        if menu is None:
+            return
+        await act("menu", lambda: api.press(user_id, menu, "restart"))
+        # При очереди перезапусков (RESTART_WORKERS > 0) сначала приходит «⏳ ... в очереди», ждём результат
+        await act("restart", lambda: api.push_command(user_id, f"/restart srv{index}"),
+                  lambda text: not text.startswith("⏳"))
+        await act("menu", lambda: api.press(user_id, menu, "login"))
+
+
+def report(latencies: dict[str, list[float]], failures: dict[str, int], elapsed: float):
+    print(f"{'действие':>10} {'всего':>6} {'ошибок':>6} {'p50 мс':>9} {'p95 мс':>9} {'p99 мс':>9} {'max мс':>9}")
+    for name in ("start", "login", "menu", "restart"):
+        values = sorted(latencies.get(name, []))
+        if not values:
+            print(f"{name:>10} {0:>6} {failures.get(name, 0):>6}")
+            continue
+
+        def pct(p: float) -> float:
+            return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+        print(f"{name:>10} {len(values):>6} {failures.get(name, 0):>6} {statistics.median(values) * 1000:>9.1f} "
+              f"{pct(0.95):>9.1f} {pct(0.99):>9.1f} {values[-1] * 1000:>9.1f}")
+    done = sum(len(values) for values in latencies.values())
+    print(f"Выполнено действий: {done} за {elapsed:.2f} с — {done / elapsed:.1f} действий/с")
+
+
+async def main():
+    args = parse_args()
+    users = [f"srv{i}" for i in range(args.users)]
+
+    api = FakeBotAPI(TOKEN, latency=args.api_latency)
+    api_port = await api.start()
+    ssh = FakeSSHServer(users, latency=args.ssh_latency, connect_latency=args.ssh_connect_latency)
+    ssh_port = ssh.start()
+
+    settings = {
+        "TELEGRAM_BOT_TOKEN": TOKEN,
+        "ADMIN_TELEGRAM_ID": str(ADMIN_ID),
+        "TELEGRAM_API_URL": f"http://127.0.0.1:{api_port}/bot",
+        "SSH_HOST": "127.0.0.1",
+        "SSH_PORT": str(ssh_port),
+        "BOT_SSH_USER": "bench",
+        "BOT_SSH_PASS": "bench",
+        "LOG_MODE": "fast",
+    }
+    settings.update(item.split("=", 1) for item in args.set)
+    workdir = setup_env(**settings)
+    logging.disable(logging.INFO)
+    await asyncio.to_thread(seed_users, args.users)
+
+    log_path = workdir / "bot.log"
+    with open(log_path, "wb") as log:
+        bot = subprocess.Popen([sys.executable, str(ROOT / "main.py")], cwd=workdir, stdout=log, stderr=log,
+                               env={**os.environ, "PYTHONPATH": str(ROOT)})
+    try:
+        try:
+            await asyncio.wait_for(api.polling.wait(), 30)
+        except asyncio.TimeoutError:
+            print(f"Бот не начал опрос Bot API, см. {log_path}")
+            return
+
+        print(f"{args.users} пользователей × {args.rounds} раундов; SSH {args.ssh_latency * 1000:.0f} мс, "
+              f"Bot API {args.api_latency * 1000:.0f} мс; настройки: {' '.join(args.set) or 'по умолчанию'}")
+        latencies: dict[str, list[float]] = defaultdict(list)
+        failures: dict[str, int] = defaultdict(int)
+        started = time.perf_counter()
+        await asyncio.gather(*(run_user(api, i, args.rounds, latencies, failures) for i in range(args.users)))
+        report(latencies, failures, time.perf_counter() - started)
+        print("Вызовы Bot API: " + ", ".join(f"{name} {count}" for name, count in api.calls.most_common()))
+        print(f"SSH: подключений {ssh.connections}, команды: "
+              + ", ".join(f"{name} {count}" for name, count in ssh.commands.most_common()))
+    finally:
+        bot.send_signal(signal.SIGINT)
+        try:
+            await asyncio.to_thread(bot.wait, 30)
+        except subprocess.TimeoutExpired:
+            bot.kill()
+        await api.stop()
+        ssh.stop()
+    print(f"Лог бота: {log_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+Операций в секунду для типичного нажатия кнопки (get_session + create_session):
+подключение на каждый вызов (старое поведение) против долгоживущего подключения с WAL.
+
+Запуск: python benchmarks/bench_db_connections.py [операций]
+"""
+import logging
+import sqlite3
+import sys
+import time
+
+from _env import setup_env
+
+OPS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+workdir = setup_env()
+logging.disable(logging.INFO)
+
+from src.config import config  # noqa: E402
+from src.db.expressions import DatabaseExpressions  # noqa: E402
+from src.db.utils import init_db, get_session, create_session, close_db_connections  # noqa: E402
+
+
+def open_per_call(telegram_id: int):
+    # Старое поведение: новое подключение (журнал по умолчанию) на каждую функцию
+    conn = sqlite3.connect(config.DB_NAME)
+    try:
+        conn.execute(DatabaseExpressions.GET_SESSION, (telegram_id,)).fetchone()
+    finally:
+        conn.close()
+    conn = sqlite3.connect(config.DB_NAME)
+    try:
+        conn.execute(DatabaseExpressions.CREATE_SESSION, (telegram_id, 1, time.time()))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def persistent(telegram_id: int):
+    get_session(telegram_id)
+    create_session(telegram_id, 1)
+
+
+def run(name: str, op) -> float:
+    started = time.perf_counter()
+    for i in range(OPS):
+        op(i % 100)
+    elapsed = time.perf_counter() - started
+    print(f"{name:>14}: {OPS / elapsed:10.0f} оп/с ({elapsed:.2f} c на {OPS})")
+    return elapsed
+
+
+if __name__ == "__main__":
+    # Отдельные файлы, чтобы режим журнала WAL не влиял на замер старого поведения
+    config.DB_NAME = workdir / "per_call.db"
+    conn = sqlite3.connect(config.DB_NAME)
+    conn.execute(DatabaseExpressions.INIT_USERS)
+    conn.execute(DatabaseExpressions.INIT_SESSIONS)
+    conn.commit()
+    conn.close()
+    before = run("open-per-call", open_per_call)
+
+    config.DB_NAME = workdir / "persistent.db"
+    init_db()
+    after = run("persistent+WAL", persistent)
+    close_db_connections()
+    print(f"Ускорение: x{before / after:.1f}")
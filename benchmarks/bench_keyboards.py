@@ -0,0 +1,78 @@
+"""
+Аллокации и время на построение меню: сборка InlineKeyboardMarkup на каждый вызов
+(старое поведение get_main_menu/get_settings_menu) против реестра клавиатур.
+
+Считаются новые отслеживаемые GC объекты на вызов (результаты удерживаются,
+чтобы посчитать весь граф кнопок) и время одного вызова.
+
+Запуск: python benchmarks/bench_keyboards.py [вызовов]
+"""
+import gc
+import logging
+import sys
+import time
+
+from _env import setup_env
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+setup_env()
+logging.disable(logging.INFO)
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup  # noqa: E402
+
+from src.config import config  # noqa: E402
+from src.engine import get_main_menu, get_settings_menu  # noqa: E402
+
+
+def old_main_menu(is_logged_in: bool = False, is_admin: bool = False):
+    keyboard = []
+    if not is_logged_in:
+        keyboard.append([InlineKeyboardButton("🔑 Войти", callback_data='login')])
+        keyboard.append([InlineKeyboardButton("📝 Зарегистрироваться", callback_data='register')])
+    else:
+        keyboard.append([InlineKeyboardButton("🔄 Перезапустить сессию", callback_data='restart')])
+        keyboard.append([InlineKeyboardButton("🚪 Выйти", callback_data='logout')])
+    if is_admin:
+        keyboard.append([InlineKeyboardButton("⚙️ Настройки", callback_data='settings')])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def old_settings_menu():
+    keyboard = [
+        [InlineKeyboardButton(f"⏱️ Таймаут сессии: {config.SESSION_TIMEOUT} сек", callback_data='dummy_info')],
+        [InlineKeyboardButton("✏️ Изменить таймаут", callback_data='change_timeout')],
+        [InlineKeyboardButton("⬅️ Назад", callback_data='back_to_main')],
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+def workload(main_menu, settings_menu):
+    # Типичная смесь: главное меню во всех вариантах и иногда настройки
+    results = []
+    for i in range(CALLS):
+        results.append(main_menu(bool(i & 1), bool(i & 2)))
+        if i % 4 == 0:
+            results.append(settings_menu())
+    return results
+
+
+def measure(name: str, main_menu, settings_menu):
+    gc.collect()
+    gc.disable()
+    before = len(gc.get_objects())
+    results = workload(main_menu, settings_menu)
+    allocated = len(gc.get_objects()) - before
+    gc.enable()
+    del results
+
+    started = time.perf_counter()
+    workload(main_menu, settings_menu)
+    elapsed = time.perf_counter() - started
+    calls = CALLS + CALLS // 4
+    print(f"{name:>9}: {allocated / calls:7.2f} объектов/вызов | {elapsed / calls * 1e6:7.2f} мкс/вызов")
+
+
+if __name__ == "__main__":
+    measure("before", old_main_menu, old_settings_menu)
+    measure("registry", get_main_menu, get_settings_menu)
@@ -0,0 +1,49 @@
+"""
+Скорость Locales.get: плоский индекс (один поиск в словаре) против прежнего
+обхода вложенных словарей с разбором ключа на каждом вызове.
+
+Используется синтетическая локаль: 20 разделов по 50 строк, глубина ключей 3.
+
+Запуск: python benchmarks/bench_locales.py [вызовов]
+"""
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _env import setup_env
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+setup_env()
+logging.disable(logging.WARNING)
+
+from src.locales import Langs, Locales  # noqa: E402
+
+
+def synthetic_locale() -> dict:
+    return {f"section{s}": {"messages": {f"key{k}": f"Строка {s}.{k}" for k in range(50)}} for s in range(20)}
+
+
+def run(name: str, lookup, keys: list[str]):
+    started = time.perf_counter()
+    n = len(keys)
+    for i in range(CALLS):
+        lookup(keys[i % n])
+    elapsed = time.perf_counter() - started
+    print(f"{name:>7}: {CALLS / elapsed:11.0f} get/с | {elapsed / CALLS * 1e9:6.0f} нс/вызов")
+
+
+if __name__ == "__main__":
+    folder = Path(tempfile.mkdtemp(prefix="rdpbot-locales-"))
+    data = synthetic_locale()
+    (folder / "ru.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    locales = Locales(str(folder), log_missing=False)
+    keys = [f"section{s}.messages.key{k}" for s in range(20) for k in range(50)]
+    # _get_missing — прежняя реализация get (обход вложенных словарей), теперь только для промахов
+    assert all(locales.get(k, Langs.RU) == locales._get_missing(k, Langs.RU, None) for k in keys)
+
+    run("nested", lambda key: locales._get_missing(key, Langs.RU, None), keys)
+    run("flat", lambda key: locales.get(key, Langs.RU), keys)
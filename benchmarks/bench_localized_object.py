@@ -0,0 +1,98 @@
+"""
+Память и скорость доступа LocalizedObject на большой синтетической локали.
+
+Сравнивает прежнее жадное дерево (объект с __dict__ на каждый вложенный словарь,
+собирается целиком при загрузке) с ленивым деревом на __slots__:
+- память сразу после загрузки и после обращения ко всем ключам;
+- время доступа к глубокому атрибуту и к отсутствующему ключу (цепочка промахов).
+
+Запуск: python benchmarks/bench_localized_object.py [разделов]
+"""
+import logging
+import sys
+import time
+import tracemalloc
+
+from _env import setup_env
+
+SECTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ACCESSES = 200000
+
+setup_env()
+logging.disable(logging.WARNING)
+
+from src.locales import LocalizedObject  # noqa: E402
+
+
+class EagerLocalizedObject:
+    """Прежняя схема построения: всё дерево создаётся сразу, значения — атрибуты в __dict__."""
+
+    def __init__(self, data=None, placeholder="<null>"):
+        self._placeholder = placeholder
+        self._is_missing_stub = False
+        self._is_list = False
+        self._list_data = []
+        if isinstance(data, dict):
+            for key, value in data.items():
+                setattr(self, key, EagerLocalizedObject(value, placeholder) if isinstance(value, (dict, list)) else value)
+        elif isinstance(data, list):
+            self._is_list = True
+            self._list_data = [EagerLocalizedObject(i, placeholder) if isinstance(i, (dict, list)) else i for i in data]
+
+    def __getattr__(self, name):
+        # Как и раньше: новая пустышка на каждый промах
+        stub = EagerLocalizedObject(placeholder=self._placeholder)
+        stub._is_missing_stub = True
+        return stub
+
+
+def synthetic_locale() -> dict:
+    return {
+        f"section{s}": {
+            f"group{g}": {f"key{k}": f"Строка {s}.{g}.{k}" for k in range(10)} | {"items": [f"пункт {i}" for i in range(5)]}
+            for g in range(50)
+        }
+        for s in range(SECTIONS)
+    }
+
+
+def touch_all(obj, data: dict):
+    for s, groups in data.items():
+        section = getattr(obj, s)
+        for g in groups:
+            getattr(section, g).key0
+
+
+def measure_memory(name: str, cls, data: dict):
+    tracemalloc.start()
+    started = time.perf_counter()
+    obj = cls(data)
+    load_time = time.perf_counter() - started
+    loaded, _ = tracemalloc.get_traced_memory()
+    touch_all(obj, data)
+    touched, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>6}: загрузка {load_time * 1000:8.1f} мс | после загрузки {loaded / 2**20:7.2f} МиБ"
+          f" | после обхода всех ключей {touched / 2**20:7.2f} МиБ")
+    return obj
+
+
+def measure_access(name: str, obj):
+    started = time.perf_counter()
+    for _ in range(ACCESSES):
+        obj.section1.group2.key3
+    hit = (time.perf_counter() - started) / ACCESSES
+    started = time.perf_counter()
+    for _ in range(ACCESSES):
+        obj.missing.chain.key
+    miss = (time.perf_counter() - started) / ACCESSES
+    print(f"{name:>6}: доступ {hit * 1e9:6.0f} нс | цепочка промахов {miss * 1e9:6.0f} нс")
+
+
+if __name__ == "__main__":
+    data = synthetic_locale()
+    print(f"Синтетическая локаль: {SECTIONS * 50 * 15} строк")
+    eager = measure_memory("eager", EagerLocalizedObject, data)
+    lazy = measure_memory("lazy", LocalizedObject, data)
+    measure_access("eager", eager)
+    measure_access("lazy", lazy)
@@ -0,0 +1,63 @@
+"""
+Записей лога в секунду: DetailedFormatter (обход стека в потоке вызова)
+против быстрого режима (FastFormatter + QueueHandler/QueueListener).
+
+Показывает время, которое тратит вызывающий поток (цикл событий), и полное
+время до записи всех строк. Вывод идёт в /dev/null.
+
+Запуск: python benchmarks/bench_logging.py [записей]
+"""
+import logging
+import os
+import sys
+import time
+
+from _env import setup_env
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+setup_env()
+
+from src import logger as log_module  # noqa: E402
+
+devnull = open(os.devnull, "w")
+# Оба режима пишут в /dev/null: меняем поток у обработчика по умолчанию
+log_module.handler.setStream(devnull)
+bench_logger = logging.getLogger("BENCH")
+
+
+class Handler:
+    def handle(self, i: int):
+        bench_logger.info("Обработано обновление %s", i)
+
+
+def run(name: str):
+    worker = Handler()
+    started = time.perf_counter()
+    for i in range(RECORDS):
+        worker.handle(i)
+    caller = time.perf_counter() - started
+    log_module.shutdown_logging()  # Дожидаемся вывода очереди (для fast)
+    total = time.perf_counter() - started
+    print(f"{name:>9}: {RECORDS / caller:9.0f} зап/с в потоке вызова | {RECORDS / total:9.0f} зап/с с выводом")
+
+
+def run_formatters():
+    # Стоимость одного format() без ввода-вывода
+    record = bench_logger.makeRecord("BENCH", logging.INFO, __file__, 1, "Обработано обновление %s", (1,), None, "handle")
+    for name, fmt in (("detailed", log_module.DetailedFormatter(log_module.LOG_FORMAT)),
+                      ("fast", log_module.FastFormatter(log_module.LOG_FORMAT))):
+        started = time.perf_counter()
+        for _ in range(RECORDS):
+            record.__dict__.pop("classPrefix", None)
+            fmt.format(record)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>9}: {RECORDS / elapsed:9.0f} format()/с")
+
+
+if __name__ == "__main__":
+    run_formatters()
+    run("detailed")
+    log_module.setup_logging("fast")
+    log_module._listener.handlers[0].setStream(devnull)
+    run("fast")
@@ -0,0 +1,72 @@
+"""
+Задержка цикла событий во время одновременных входов.
+
+Сравнивает проверку пароля прямо в цикле событий (как было раньше)
+с проверкой через password_hasher. Пока идут входы, фоновая задача
+каждые 5 мс замеряет, насколько опоздал её таймер.
+
+Запуск: python benchmarks/bench_login_latency.py [логинов] [воркеров]
+"""
+import asyncio
+import logging
+import secrets
+import statistics
+import sys
+import time
+
+from _env import setup_env
+
+LOGINS = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+WORKERS = sys.argv[2] if len(sys.argv) > 2 else "4"
+TICK = 0.005
+
+setup_env(HASH_WORKERS=WORKERS)
+logging.disable(logging.INFO)
+
+from src.db.hashing import hash_password, password_hasher  # noqa: E402
+
+SECRET = "bench-secret"
+SALT = "00" * 16
+STORED = hash_password("p@ss", SALT, SECRET)
+
+
+async def inline_verify() -> bool:
+    # Старое поведение: PBKDF2 прямо в корутине
+    return secrets.compare_digest(hash_password("p@ss", SALT, SECRET), STORED)
+
+
+async def pooled_verify() -> bool:
+    return await password_hasher.verify("p@ss", SALT, STORED)
+
+
+async def measure(verify) -> tuple[float, float, float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - started - TICK)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 2)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker_task
+    assert all(results)
+    return elapsed, max(lags) * 1000, statistics.median(lags) * 1000
+
+
+async def main():
+    print(f"{LOGINS} одновременных входов, воркеров хеширования: {WORKERS}")
+    for name, verify in (("inline", inline_verify), ("pool", pooled_verify)):
+        elapsed, max_lag, median_lag = await measure(verify)
+        print(f"{name:>7}: всего {elapsed:6.2f} c | макс. задержка цикла {max_lag:8.1f} мс | медиана {median_lag:6.1f} мс")
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
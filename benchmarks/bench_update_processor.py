@@ -0,0 +1,81 @@
+"""
+Задержка обработки обновлений, когда один пользователь ждёт медленный SSH.
+
+Один пользователь отправляет несколько /restart подряд (каждый ждёт SSH_DELAY),
+остальные в это время нажимают кнопки (FAST_DELAY на обработку). Сравниваются
+последовательная обработка (как было) и PerUserUpdateProcessor. Обновления
+подаются так же, как это делает Application: задача на каждое обновление.
+Дополнительно проверяется, что обновления одного пользователя выполнились по порядку.
+
+Запуск: python benchmarks/bench_update_processor.py [пользователей] [лимит]
+"""
+import asyncio
+import logging
+import statistics
+import sys
+import time
+
+from _env import setup_env
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+LIMIT = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+SLOW_UPDATES = 3
+SSH_DELAY = 0.5
+FAST_DELAY = 0.005
+
+setup_env()
+logging.disable(logging.INFO)
+
+from telegram import CallbackQuery, Update, User  # noqa: E402
+from telegram.ext import SimpleUpdateProcessor  # noqa: E402
+
+from src.update_processor import PerUserUpdateProcessor  # noqa: E402
+
+
+def make_update(update_id: int, user_id: int) -> Update:
+    user = User(user_id, "bench", False)
+    return Update(update_id, callback_query=CallbackQuery(str(update_id), user, "bench", data="login"))
+
+
+async def run(processor) -> tuple[list[float], bool]:
+    order: dict[int, list[int]] = {}
+    latencies: list[float] = []
+
+    async def handle(update: Update, delay: float, received: float):
+        await asyncio.sleep(delay)
+        order.setdefault(update.effective_user.id, []).append(update.update_id)
+        if delay == FAST_DELAY:
+            latencies.append(time.perf_counter() - received)
+
+    updates = [(make_update(i, 1), SSH_DELAY) for i in range(SLOW_UPDATES)]
+    updates += [(make_update(SLOW_UPDATES + i, 100 + i % USERS), FAST_DELAY) for i in range(USERS * 2)]
+
+    async with processor:
+        tasks = []
+        received = time.perf_counter()  # Все обновления пришли одной пачкой
+        for update, delay in updates:
+            coroutine = handle(update, delay, received)
+            if processor.max_concurrent_updates > 1:
+                tasks.append(asyncio.create_task(processor.process_update(update, coroutine)))
+            else:
+                # Последовательная обработка: Application ждёт каждое обновление
+                await processor.process_update(update, coroutine)
+        await asyncio.gather(*tasks)
+    in_order = all(ids == sorted(ids) for ids in order.values())
+    return latencies, in_order
+
+
+async def main():
+    print(f"1 пользователь × {SLOW_UPDATES} /restart по {SSH_DELAY} с, {USERS} пользователей × 2 нажатия")
+    for name, processor in (("последовательно", SimpleUpdateProcessor(1)),
+                            (f"по пользователям (лимит {LIMIT})", PerUserUpdateProcessor(LIMIT))):
+        started = time.perf_counter()
+        latencies, in_order = await run(processor)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        print(f"{name:>28}: всего {elapsed:6.2f} с | нажатия p50 {statistics.median(latencies) * 1000:8.1f} мс"
+              f" | p95 {latencies[int(len(latencies) * 0.95)] * 1000:8.1f} мс | порядок соблюдён: {in_order}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
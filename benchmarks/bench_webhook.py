@@ -0,0 +1,102 @@
+"""
+Нагрузочный тест вебхука: отправляет синтетические Update в JSON на работающий бот.
+
+Бот нужно запустить с RUN_MODE=webhook (WEBHOOK_LISTEN/WEBHOOK_PORT/WEBHOOK_PATH
+из .env). Тест открывает несколько keep-alive соединений и замеряет, сколько
+обновлений в секунду бот принимает, и задержку ответа на POST.
+Ответы Bot API на синтетические чаты бот получит с ошибками — это ожидаемо,
+нагружается именно приём и обработка обновлений.
+
+Запуск: python benchmarks/bench_webhook.py [url] [обновлений] [соединений] [пользователей]
+Секрет вебхука берётся из переменной окружения WEBHOOK_SECRET.
+"""
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+URL = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8080/telegram"
+UPDATES = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+CONNECTIONS = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+USERS = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+_update_ids = itertools.count(1)
+
+
+def make_update(i: int) -> bytes:
+    """Синтетический Update: чередуются команда /start и нажатия кнопок главного меню."""
+    user = {"id": 10_000 + i % USERS, "is_bot": False, "first_name": "Load", "language_code": "ru"}
+    chat = {"id": user["id"], "type": "private"}
+    message = {"message_id": i, "date": int(time.time()), "chat": chat, "from": user}
+    if i % 3 == 0:
+        update = {"message": {**message, "text": "/start",
+                              "entities": [{"type": "bot_command", "offset": 0, "length": 6}]}}
+    else:
+        update = {"callback_query": {"id": str(i), "from": user, "chat_instance": str(chat["id"]),
+                                     "message": {**message, "text": "menu"},
+                                     "data": "login" if i % 3 == 1 else "register"}}
+    update["update_id"] = next(_update_ids)
+    return json.dumps(update).encode()
+
+
+async def worker(host: str, port: int, path: str, jobs: asyncio.Queue, latencies: list[float],
+                 statuses: dict[int, int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                body = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            headers = (
+                f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                + (f"X-Telegram-Bot-Api-Secret-Token: {SECRET}\r\n" if SECRET else "")
+                + "\r\n"
+            )
+            started = time.perf_counter()
+            writer.write(headers.encode() + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            status = int(status_line.split()[1]) if status_line else 0
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def main():
+    url = urlsplit(URL)
+    host, port, path = url.hostname, url.port or 80, url.path or "/"
+    jobs: asyncio.Queue = asyncio.Queue()
+    for i in range(UPDATES):
+        jobs.put_nowait(make_update(i))
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, path, jobs, latencies, statuses) for _ in range(CONNECTIONS)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    print(f"{URL}: {len(latencies)} обновлений, {CONNECTIONS} соединений, {USERS} пользователей")
+    print(f"  {len(latencies) / elapsed:8.0f} обновлений/сек | ответы: {statuses}")
+    print(f"  задержка: p50 {p(0.5):.2f} мс | p95 {p(0.95):.2f} мс | p99 {p(0.99):.2f} мс"
+          f" | среднее {statistics.mean(latencies) * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Заглушка сервера сессий Windows для офлайн-бенчмарков.
+
+SSH-сервер на paramiko: принимает любой пароль и выполняет две команды —
+`query session` (таблица сессий в cp866, как на русской Windows) и
+`logoff <ID>`. Задержки подключения и выполнения команд настраиваются.
+После logoff пользователь сразу «переподключается» с новым ID сессии,
+поэтому один и тот же пользователь может перезапускаться многократно.
+"""
+import itertools
+import socket
+import threading
+import time
+from collections import Counter
+
+import paramiko
+
+HEADER = " СЕАНС             ПОЛЬЗОВАТЕЛЬ             ID  СТАТУС  ТИП         УСТР-ВО"
+
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, fake: "FakeSSHServer"):
+        self.fake = fake
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "password"
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        if self.fake.connect_latency:
+            time.sleep(self.fake.connect_latency)
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel: paramiko.Channel, command: bytes) -> bool:
+        threading.Thread(target=self.fake._execute, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+
+class FakeSSHServer:
+    def __init__(self, users: list[str], latency: float = 0.05, connect_latency: float = 0.0):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.commands: Counter[str] = Counter()
+        self.connections = 0
+
+        self._ids = itertools.count(2)
+        self._lock = threading.Lock()
+        self._sessions: dict[int, str] = {next(self._ids): user for user in users}  # ID -> пользователь
+        self._key = paramiko.RSAKey.generate(2048)
+        self._socket: socket.socket | None = None
+        self._transports: list[paramiko.Transport] = []
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._socket = socket.create_server((host, port))
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self._socket.getsockname()[1]
+
+    def stop(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        for transport in self._transports:
+            transport.close()
+
+    def _accept_loop(self):
+        while self._socket is not None:
+            try:
+                sock, _ = self._socket.accept()
+            except OSError:
+                return
+            self.connections += 1
+            transport = paramiko.Transport(sock)
+            transport.add_server_key(self._key)
+            transport.start_server(server=_Server(self))
+            self._transports.append(transport)
+            threading.Thread(target=self._drain_channels, args=(transport,), daemon=True).start()
+
+    @staticmethod
+    def _drain_channels(transport: paramiko.Transport):
+        # Команды выполняются в check_channel_exec_request, здесь каналы только удерживаются:
+        # транспорт хранит их по слабым ссылкам, и потерянный канал закрывается сборщиком мусора
+        channels: list[paramiko.Channel] = []
+        while transport.is_active():
+            channel = transport.accept(1)
+            channels = [c for c in channels if not c.closed]
+            if channel is not None:
+                channels.append(channel)
+
+    def _table(self) -> str:
+        lines = [HEADER, " services                                    0  Диск",
+                 ">console                                     1  Подключено"]
+        with self._lock:
+            for session_id, user in sorted(self._sessions.items()):
+                lines.append(f" rdp-tcp#{session_id:<9} {user:<20} {session_id:>6}  Активно")
+        lines.append(" rdp-tcp                                 65536  Прослушивание")
+        return "\n".join(lines)
+
+    def _logoff(self, session_id: int) -> str:
+        with self._lock:
+            user = self._sessions.pop(session_id, None)
+            if user is None:
+                return f"Сеанс с ID {session_id} не найден."
+            self._sessions[next(self._ids)] = user  # Пользователь переподключается
+        return ""
+
+    def _run(self, command: str) -> tuple[str, str]:
+        parts = command.split()
+        if parts[:2] == ["query", "session"]:
+            return self._table(), ""
+        if len(parts) == 2 and parts[0] == "logoff" and parts[1].isdigit():
+            return "", self._logoff(int(parts[1]))
+        return "", f"Неизвестная команда: {command}"
+
+    def _execute(self, channel: paramiko.Channel, command: str):
+        self.commands[command.split(maxsplit=1)[0] if command.strip() else ""] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        output, error = self._run(command)
+        try:
+            if output:
+                channel.sendall(output.encode("cp866"))
+            if error:
+                channel.sendall_stderr(error.encode("cp866"))
+            channel.send_exit_status(1 if error else 0)
+        except OSError:
+            pass  # Клиент закрыл канал, не дождавшись ответа (например, по таймауту)
+        finally:
+            channel.close()
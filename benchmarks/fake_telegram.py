@@ -0,0 +1,181 @@
+"""
+Заглушка Telegram Bot API для офлайн-бенчмарков.
+
+HTTP/1.1 с keep-alive на asyncio: getMe, getUpdates (long polling),
+sendMessage, editMessageText, deleteMessage, answerCallbackQuery; остальные
+методы отвечают true. Синтетические пользователи отправляют команды и нажимают
+кнопки через push_command/press, а ответ бота ждут через next_menu — следующее
+сообщение с клавиатурой (основное сообщение бота) в их чате.
+Модуль не зависит от src — бот работает в отдельном процессе.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Callable
+from urllib.parse import parse_qsl
+
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+class FakeBotAPI:
+    def __init__(self, token: str, latency: float = 0.0):
+        self.token = token
+        self.latency = latency  # Задержка ответа на каждый метод, кроме getUpdates
+        self.calls: Counter[str] = Counter()
+        self.errors = 0
+        self.polling = asyncio.Event()  # Бот начал запрашивать getUpdates
+
+        self._updates: list[dict] = []
+        self._new_update = asyncio.Event()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._callback_ids = itertools.count(1)
+        self._menu_waiters: dict[int, list[tuple[asyncio.Future, Callable[[str], bool] | None]]] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    @staticmethod
+    def _user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "language_code": "ru"}
+
+    def _message(self, chat_id: int, text: str, sender: dict, message_id: int | None = None,
+                 reply_markup: dict | None = None) -> dict:
+        message = {
+            "message_id": message_id if message_id is not None else next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": sender,
+            "text": text,
+        }
+        if reply_markup is not None:
+            message["reply_markup"] = reply_markup
+        return message
+
+    def _push(self, update: dict):
+        update["update_id"] = next(self._update_ids)
+        self._updates.append(update)
+        self._new_update.set()
+
+    # --- Синтетические пользователи ---
+
+    def next_menu(self, chat_id: int, accept: Callable[[str], bool] | None = None) -> asyncio.Future:
+        """
+        Future со следующим сообщением с клавиатурой в чате (регистрировать до отправки действия).
+        accept отбирает сообщения по тексту, например пропускает промежуточные статусы.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._menu_waiters.setdefault(chat_id, []).append((future, accept))
+        return future
+
+    def push_command(self, user_id: int, text: str):
+        """Пользователь пишет команду в личный чат с ботом."""
+        message = self._message(user_id, text, self._user(user_id))
+        command = text.split(maxsplit=1)[0]
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        self._push({"message": message})
+
+    def press(self, user_id: int, message: dict, data: str):
+        """Пользователь нажимает кнопку под сообщением бота."""
+        self._push({"callback_query": {
+            "id": str(next(self._callback_ids)),
+            "from": self._user(user_id),
+            "chat_instance": str(user_id),
+            "message": message,
+            "data": data,
+        }})
+
+    # --- HTTP ---
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = request_line.decode("latin-1").split()[1]
+                status, payload = await self._dispatch(path, headers.get("content-type", ""), body)
+                data = json.dumps(payload, ensure_ascii=False).encode()
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Заглушку остановили во время long polling
+        finally:
+            writer.close()
+
+    async def _dispatch(self, path: str, content_type: str, body: bytes) -> tuple[str, dict]:
+        prefix = f"/bot{self.token}/"
+        if not path.startswith(prefix):
+            return "404 Not Found", {"ok": False, "error_code": 404, "description": "Not Found"}
+        method = path[len(prefix):].split("?")[0]
+        if "json" in content_type:
+            params = json.loads(body or b"{}")
+        else:
+            params = dict(parse_qsl(body.decode()))
+        self.calls[method] += 1
+        if method.lower() != "getupdates" and self.latency:
+            await asyncio.sleep(self.latency)
+        handler = getattr(self, f"_api_{method.lower()}", None)
+        try:
+            result = await handler(params) if handler else True
+        except (KeyError, ValueError) as e:
+            self.errors += 1
+            return "400 Bad Request", {"ok": False, "error_code": 400, "description": f"Bad Request: {e}"}
+        return "200 OK", {"ok": True, "result": result}
+
+    async def _api_getme(self, params: dict) -> dict:
+        return BOT_USER
+
+    async def _api_getupdates(self, params: dict) -> list[dict]:
+        self.polling.set()
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        # Обновления до offset бот подтвердил
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    def _bot_message(self, params: dict, message_id: int | None = None) -> dict:
+        chat_id = int(params["chat_id"])
+        markup = params.get("reply_markup")
+        if isinstance(markup, str):
+            markup = json.loads(markup)
+        message = self._message(chat_id, params["text"], BOT_USER, message_id, markup)
+        if markup is not None:
+            # Основное сообщение бота (с меню) — ответ на действие пользователя
+            waiters = self._menu_waiters.pop(chat_id, [])
+            for future, accept in waiters:
+                if accept is None or accept(message["text"]):
+                    if not future.done():
+                        future.set_result(message)
+                elif not future.done():
+                    self._menu_waiters.setdefault(chat_id, []).append((future, accept))
+        return message
+
+    async def _api_sendmessage(self, params: dict) -> dict:
+        return self._bot_message(params)
+
+    async def _api_editmessagetext(self, params: dict) -> dict:
+        return self._bot_message(params, int(params["message_id"]))
@@ -0,0 +1,59 @@
+"""
+Определение сессии пользователя один раз на обновление.
+resolve_session зарегистрирован как TypeHandler в группе -1 и выполняется до
+остальных обработчиков; результат кешируется в context, и обработчики берут
+его через get_session_state, не обращаясь к сессии повторно.
+"""
+import time
+from dataclasses import dataclass
+
+from telegram import Update
+from telegram.ext import ContextTypes, TypeHandler
+
+from src.config import config
+from src.db.async_utils import get_session
+from src.engine import resolve_language
+from src.locales import Langs
+from src.tracing import span
+
+
+@dataclass(frozen=True)
+class SessionState:
+    """Состояние пользователя на момент обработки обновления."""
+    user_id: int
+    bot_user_id: int | None
+    timestamp: float | None
+    is_logged_in: bool
+    is_admin: bool
+    lang: Langs
+
+
+async def get_session_state(update: Update, context: ContextTypes.DEFAULT_TYPE) -> SessionState:
+    """Состояние сессии для текущего обновления: из context или (при первом обращении) из кеша сессий."""
+    state = getattr(context, 'session_state', None)
+    if state is not None:
+        return state
+    user = update.effective_user
+    bot_user_id, timestamp = await get_session(user.id)
+    state = SessionState(
+        user_id=user.id,
+        bot_user_id=bot_user_id,
+        timestamp=timestamp,
+        is_logged_in=bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT,
+        is_admin=user.id == config.ADMIN_TELEGRAM_ID,
+        lang=await resolve_language(user),
+    )
+    context.session_state = state
+    return state
+
+
+async def resolve_session(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Промежуточный обработчик: определяет сессию до основных обработчиков."""
+    if update.effective_user is not None:
+        with span("session"):
+            await get_session_state(update, context)
+
+
+# Группа -1 выполняется раньше обработчиков команд и кнопок (группа 0)
+session_middleware = TypeHandler(Update, resolve_session)
+SESSION_MIDDLEWARE_GROUP = -1
@@ -1,47 +1,135 @@
+import asyncio
 import sys
 
 from telegram.ext import (
+    Application,
     ApplicationBuilder,
     CommandHandler,
     CallbackQueryHandler,
 )
 
+from src.auth import SESSION_MIDDLEWARE_GROUP, session_middleware
 from src.commands.admin_commands.approve import approve_user_command
 from src.commands.admin_commands.set_timeout import set_timeout
+from src.commands.language import language
 from src.commands.login import login
 from src.commands.logout import logout
 from src.commands.register import register
 from src.commands.restart import restart
 from src.commands.start import start
 from src.config import config
+from src.db.async_utils import shutdown_db, run_session_flusher, run_session_reaper, flush_sessions
+from src.db.hashing import password_hasher
 from src.db.utils import init_db
 from src.handlers.buttons.approve_button import button_approve_handler
 from src.handlers.buttons.main_buttons import button_handler
 from src.handlers.buttons.settings_buttons import settings_button_handler
-from src.logger import logger
+from src.locales import locales
+from src.logger import logger, setup_logging
+from src.metrics import metrics, start_metrics_server, track_handler
+from src.restart_jobs import restart_queue
+from src.ssh import close_ssh, hosts
+from src.tracing import (
+    TRACE_BEGIN_GROUP,
+    TRACE_END_GROUP,
+    TracingRequest,
+    trace_begin_handler,
+    trace_end_handler,
+    tracer,
+)
+from src.update_processor import PerUserUpdateProcessor
+
+async def on_startup(app: Application):
+    """Запускает фоновые задачи бота."""
+    app.bot_data['session_reaper'] = asyncio.create_task(run_session_reaper())
+    if config.SESSION_WRITE_BEHIND:
+        app.bot_data['session_flusher'] = asyncio.create_task(run_session_flusher())
+    if config.PRESENCE_POLL_INTERVAL > 0:
+        app.bot_data['presence_poller'] = asyncio.create_task(hosts.run_presence_poller(config.PRESENCE_POLL_INTERVAL))
+    if config.LOCALES_RELOAD_INTERVAL > 0:
+        app.bot_data['locales_watcher'] = asyncio.create_task(locales.watch(config.LOCALES_RELOAD_INTERVAL))
+    if config.METRICS_PORT > 0:
+        app.bot_data['metrics_server'] = await start_metrics_server(config.METRICS_LISTEN, config.METRICS_PORT)
+    if restart_queue.enabled:
+        await restart_queue.start(app)
+
+async def on_shutdown(app: Application):
+    """Останавливает фоновые задачи и сохраняет отложенные данные."""
+    for name in ('session_reaper', 'session_flusher', 'locales_watcher', 'presence_poller'):
+        task = app.bot_data.pop(name, None)
+        if task:
+            task.cancel()
+    server = app.bot_data.pop('metrics_server', None)
+    if server:
+        server.close()
+    await restart_queue.stop()
+    await flush_sessions()
 
 def main():
+    setup_logging(config.LOG_MODE)
     init_db()  # Инициализируем БД при запуске
-    app = ApplicationBuilder().token(config.BOT_TOKEN).build()
-
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("register", register))
-    app.add_handler(CommandHandler("approve", approve_user_command))  # Для админа
-    app.add_handler(CommandHandler("login", login))
-    app.add_handler(CommandHandler("restart", restart))
-    app.add_handler(CommandHandler("logout", logout))
+    builder = (
+        ApplicationBuilder()
+        .token(config.BOT_TOKEN)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+    )
+    if config.TELEGRAM_API_URL:
+        builder.base_url(config.TELEGRAM_API_URL)
+    if config.TRACE_FILE:
+        tracer.open(config.TRACE_FILE, config.TRACE_MAX_BYTES, config.TRACE_BACKUPS)
+        # Вызовы Bot API записываются как спаны (getUpdates идёт отдельным запросом и не трассируется)
+        builder.request(TracingRequest(connection_pool_size=256))
+    # Медленный /restart одного пользователя не задерживает остальных. При UPDATE_CONCURRENCY=1
+    # обработка последовательная, но замки пользователей остаются (их берёт очередь перезапусков)
+    processor = PerUserUpdateProcessor(config.UPDATE_CONCURRENCY, config.UPDATE_MAX_PENDING)
+    builder.concurrent_updates(processor)
+    metrics.gauge("bot_updates_running", "Обработчики обновлений, выполняющиеся сейчас", lambda: processor.running)
+    metrics.gauge("bot_updates_waiting_users", "Пользователи с обрабатываемыми или ожидающими обновлениями",
+                  lambda: processor.waiting_users)
+    app = builder.build()
+
+    if tracer.enabled:
+        app.add_handler(trace_begin_handler, group=TRACE_BEGIN_GROUP)
+        app.add_handler(trace_end_handler, group=TRACE_END_GROUP)
+    # Сессия пользователя определяется один раз на обновление, до остальных обработчиков
+    app.add_handler(session_middleware, group=SESSION_MIDDLEWARE_GROUP)
+    app.add_handler(CommandHandler("start", track_handler(start)))
+    app.add_handler(CommandHandler("register", track_handler(register)))
+    app.add_handler(CommandHandler("approve", track_handler(approve_user_command)))  # Для админа
+    app.add_handler(CommandHandler("login", track_handler(login)))
+    app.add_handler(CommandHandler("restart", track_handler(restart)))
+    app.add_handler(CommandHandler("logout", track_handler(logout)))
+    app.add_handler(CommandHandler("language", track_handler(language)))
     # Новые обработчики для настроек
-    app.add_handler(CommandHandler("set_timeout", set_timeout))  # Для админа
+    app.add_handler(CommandHandler("set_timeout", track_handler(set_timeout)))  # Для админа
 
     # Обработчики для кнопок
     # Основные кнопки (включая "Настройки")
-    app.add_handler(CallbackQueryHandler(button_handler, pattern='^(login|restart|logout|register|settings)$'))
+    app.add_handler(CallbackQueryHandler(track_handler(button_handler), pattern='^(login|restart|logout|register|settings)$'))
     # Кнопки внутри меню настроек
-    app.add_handler(CallbackQueryHandler(settings_button_handler, pattern='^(change_timeout|back_to_main|dummy_info)$'))
+    app.add_handler(CallbackQueryHandler(track_handler(settings_button_handler), pattern='^(change_timeout|back_to_main|dummy_info)$'))
     # Кнопка одобрения
-    app.add_handler(CallbackQueryHandler(button_approve_handler, pattern='^approve_'))
+    app.add_handler(CallbackQueryHandler(track_handler(button_approve_handler), pattern='^approve_'))
 
-    logger.info("Бот запущен...")
-    app.run_polling()
+    if config.RUN_MODE == 'webhook':
+        logger.info(f"Бот запущен (webhook {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT}/{config.WEBHOOK_PATH})...")
+        # Telegram сам доставляет обновления: нет постоянного getUpdates и задержки long polling
+        app.run_webhook(
+            listen=config.WEBHOOK_LISTEN,
+            port=config.WEBHOOK_PORT,
+            url_path=config.WEBHOOK_PATH,
+            webhook_url=config.WEBHOOK_URL,
+            secret_token=config.WEBHOOK_SECRET,
+            cert=config.WEBHOOK_CERT,
+            key=config.WEBHOOK_KEY,
+        )
+    else:
+        logger.info("Бот запущен...")
+        app.run_polling()
+    close_ssh()  # Закрываем открытые SSH-подключения при остановке
+    password_hasher.shutdown()
+    shutdown_db()
+    tracer.close()
 
 main() if __name__ != "__main__" else logger.info("import this file as module instead directly run"); sys.exit(0)
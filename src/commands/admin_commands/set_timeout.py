@@ -1,11 +1,9 @@
-import asyncio
-import time
-
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from src.auth import get_session_state
 from src.config import config
-from src.db.utils import get_session
+from src.edit_coalescer import edit_coalescer
 from src.engine import update_main_message, get_settings_menu
 from src.logger import logger
 
@@ -19,9 +17,7 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if user_id != config.ADMIN_TELEGRAM_ID:
         response_text = "❌ У вас нет прав для изменения настроек."
         # Отправляем ответ админу в основном сообщении
-        bot_user_id, timestamp = get_session(user_id)
-        is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
-        is_admin_user = (user_id == config.ADMIN_TELEGRAM_ID)
+        is_logged_in = (await get_session_state(update, context)).is_logged_in
         await update_main_message(update, context, response_text, is_logged_in)
         try:
              await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
@@ -33,9 +29,7 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args or not context.args[0].isdigit():
         response_text = "Используйте: `/set_timeout <значение_в_секундах>`"
         # Отправляем ответ админу в основном сообщении
-        bot_user_id, timestamp = get_session(user_id)
-        is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
-        is_admin_user = (user_id == config.ADMIN_TELEGRAM_ID)
+        is_logged_in = (await get_session_state(update, context)).is_logged_in
         await update_main_message(update, context, response_text, is_logged_in)
         try:
              await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
@@ -49,9 +43,7 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if new_timeout <= 0:
         response_text = "❌ Значение таймаута должно быть положительным числом."
         # Отправляем ответ админу в основном сообщении
-        bot_user_id, timestamp = get_session(user_id)
-        is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
-        is_admin_user = (user_id == config.ADMIN_TELEGRAM_ID)
+        is_logged_in = (await get_session_state(update, context)).is_logged_in
         await update_main_message(update, context, response_text, is_logged_in)
         try:
              await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
@@ -61,7 +53,7 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     old_timeout = config.SESSION_TIMEOUT
-    SESSION_TIMEOUT = new_timeout
+    config.SESSION_TIMEOUT = new_timeout  # Меню настроек пересоберётся с новым значением
 
     response_text = f"✅ Таймаут сессии изменён с {old_timeout} сек на {new_timeout} сек."
 
@@ -77,22 +69,19 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     main_chat_id = context.user_data.get('main_menu_chat_id') or chat_id
     main_message_id = context.user_data.get('main_menu_message_id')
 
+    # Подтверждение и меню настроек одной правкой вместо двух с паузой между ними
+    settings_text = response_text + "\n\n⚙️ *Настройки бота*\n\nТекущие параметры:"
+    lang = (await get_session_state(update, context)).lang
+
     if main_message_id:
         try:
-            await context.bot.edit_message_text(
-                chat_id=main_chat_id,
-                message_id=main_message_id,
-                text=response_text + "\n\nВозвращаюсь в настройки...",
-                parse_mode='Markdown'
-            )
-            # Небольшая задержка перед возвратом в меню настроек
-            await asyncio.sleep(1.5)
-            await context.bot.edit_message_text(
+            await edit_coalescer.edit(
+                context.bot,
                 chat_id=main_chat_id,
                 message_id=main_message_id,
-                text="⚙️ *Настройки бота*\n\nТекущие параметры:",
+                text=settings_text,
                 parse_mode='Markdown',
-                reply_markup=get_settings_menu()
+                reply_markup=get_settings_menu(lang)
             )
         except Exception as e:
              logger.error(f"Ошибка обновления основного сообщения после set_timeout: {e}")
@@ -100,8 +89,8 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
              try:
                  sent_message = await context.bot.send_message(
                      chat_id=main_chat_id,
-                     text="⚙️ *Настройки бота*\n\nТекущие параметры:",
-                     reply_markup=get_settings_menu(),
+                     text=settings_text,
+                     reply_markup=get_settings_menu(lang),
                      parse_mode='Markdown'
                  )
                  context.user_data['main_menu_message_id'] = sent_message.message_id
@@ -113,8 +102,8 @@ async def set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
         try:
              sent_message = await context.bot.send_message(
                  chat_id=main_chat_id,
-                 text="⚙️ *Настройки бота*\n\nТекущие параметры:",
-                 reply_markup=get_settings_menu(),
+                 text=settings_text,
+                 reply_markup=get_settings_menu(lang),
                  parse_mode='Markdown'
              )
              context.user_data['main_menu_message_id'] = sent_message.message_id
@@ -0,0 +1,45 @@
+from src.auth import get_session_state
+from src.db.async_utils import set_user_language
+from src.engine import update_main_message
+from src.locales import Langs, locales
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.logger import commandLogger
+
+
+async def language(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Команда /language <ru|en>: сохраняет язык интерфейса пользователя."""
+    user_id = update.effective_user.id
+    chat_id = update.effective_chat.id
+    message_id = update.effective_message.message_id
+
+    state = await get_session_state(update, context)
+    is_logged_in = state.is_logged_in
+
+    codes = ', '.join(f"`{lang.value}`" for lang in Langs)
+    # Ответ на языке пользователя; после смены языка — уже на новом
+    reply_lang = state.lang
+    lang = None
+    if not context.args:
+        status_text = locales.get("language.usage", reply_lang).format(codes=codes)
+    else:
+        try:
+            lang = Langs(context.args[0].strip().lower())
+        except ValueError:
+            status_text = locales.get("language.unknown", reply_lang).format(codes=codes)
+        else:
+            if await set_user_language(user_id, lang):
+                status_text = locales.get("language.saved", lang).format(code=lang.value)
+                commandLogger.info(f"Пользователь {user_id} выбрал язык {lang.value}")
+            else:
+                status_text = locales.get("language.not_registered", reply_lang)
+                lang = None
+
+    # Удаляем исходное сообщение пользователя
+    try:
+        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        commandLogger.debug(f"Сообщение /language от пользователя {user_id} удалено.")
+    except Exception as e:
+        commandLogger.warning(f"Не удалось удалить сообщение /language {message_id}: {e}")
+    await update_main_message(update, context, status_text, is_logged_in, lang=lang)
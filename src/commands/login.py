@@ -1,7 +1,5 @@
-import time
-
-from src.config import config
-from src.db.utils import cleanup_expired_sessions, get_session, create_session, authenticate_user
+from src.auth import get_session_state
+from src.db.async_utils import create_session, authenticate_user
 from src.engine import update_main_message
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -13,15 +11,13 @@ async def login(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     message_id = update.effective_message.message_id
-    # Очистка истёкших сессий
-    cleanup_expired_sessions()
 
     # Проверка, если пользователь уже залогинен (по сессии)
-    bot_user_id, timestamp = get_session(user_id)
-    is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
+    session = await get_session_state(update, context)
+    bot_user_id, is_logged_in = session.bot_user_id, session.is_logged_in
     if is_logged_in:
         # Обновляем таймаут
-        create_session(user_id, bot_user_id)
+        await create_session(user_id, bot_user_id)
         status_text = "✅ Вы уже вошли в систему."
         # Удаляем исходное сообщение пользователя
         try:
@@ -49,10 +45,10 @@ async def login(update: Update, context: ContextTypes.DEFAULT_TYPE):
     username = context.args[0].strip()
     password = context.args[1]
     # Проверка учётных данных
-    authenticated_telegram_id, authenticated_bot_user_id = authenticate_user(username, password)
+    authenticated_telegram_id, authenticated_bot_user_id = await authenticate_user(username, password)
     if authenticated_telegram_id is not None and authenticated_telegram_id == user_id:
         # Успешная аутентификация и проверка Telegram ID
-        create_session(user_id, authenticated_bot_user_id) # Создаем или обновляем сессию
+        await create_session(user_id, authenticated_bot_user_id) # Создаем или обновляем сессию
         status_text = f"✅ Вы вошли как `{username}`."
         is_logged_in = True
         logger.info(f"Пользователь {user_id} успешно вошёл как {username}")
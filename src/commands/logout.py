@@ -1,4 +1,4 @@
-from src.db.utils import delete_session
+from src.db.async_utils import delete_session
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.engine import update_main_message
@@ -9,7 +9,7 @@ async def logout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     message_id = update.effective_message.message_id
-    delete_session(user_id) # Удаляем сессию
+    await delete_session(user_id) # Удаляем сессию
     status_text = "✅ Вы вышли из системы."
     # Удаляем исходное сообщение пользователя
     try:
@@ -1,6 +1,5 @@
 from src.config import config
-from src.db.expressions import DatabaseExpressions
-from src.db.utils import get_db_connection, register_bot_user
+from src.db.async_utils import get_user_status, register_bot_user
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
@@ -14,13 +13,9 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message_id = update.effective_message.message_id
 
     # Проверка, не зарегистрирован ли уже пользователь
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(DatabaseExpressions.GET_USER_STATUS, (user_id,))
-        existing_user = cursor.fetchone()
+    status = await get_user_status(user_id)
 
-    if existing_user:
-        status = existing_user[0]
+    if status is not None:
         if status == 'active':
             status_text = "✅ Вы уже зарегистрированы и одобрены."
         elif status == 'pending':
@@ -54,7 +49,7 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
     username = context.args[0].strip()
     password = context.args[1]
 
-    if register_bot_user(user_id, username, password):
+    if await register_bot_user(user_id, username, password):
         status_text = "✅ Регистрация прошла успешно. Ожидайте одобрения администратора."
         # Уведомляем админа (отдельным сообщением, как и было)
         approve_button = InlineKeyboardButton("✅ Одобрить", callback_data=f'approve_{user_id}')
@@ -1,11 +1,13 @@
 import asyncio
-import time
 
+from src.auth import get_session_state
 from src.config import config
-from src.db.utils import cleanup_expired_sessions, get_session, create_session
+from src.db.async_utils import create_session
+from src.edit_coalescer import edit_coalescer
 from src.engine import update_main_message
 from src.logger import logger
-from src.ssh import restart_user_session_on_server
+from src.restart_jobs import restart_queue
+from src.ssh import restart_user_session_on_server, restart_user_sessions
 from telegram import Update
 from telegram.ext import ContextTypes
 
@@ -14,12 +16,10 @@ async def restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     message_id = update.effective_message.message_id
-    # Очистка истёкших сессий
-    cleanup_expired_sessions()
 
     # Проверка наличия активной сессии
-    bot_user_id, timestamp = get_session(user_id)
-    is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
+    session = await get_session_state(update, context)
+    bot_user_id, is_logged_in = session.bot_user_id, session.is_logged_in
     if not is_logged_in:
         status_text = "❌ Сначала авторизуйтесь."
         # Удаляем исходное сообщение пользователя
@@ -32,7 +32,7 @@ async def restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Обновляем таймаут сессии
-    create_session(user_id, bot_user_id)
+    await create_session(user_id, bot_user_id)
 
     if not context.args:
         status_text = (
@@ -49,6 +49,11 @@ async def restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update_main_message(update, context, status_text, is_logged_in=True)
         return
 
+    # Несколько пользователей или группа (@имя) — массовый перезапуск одной командой
+    if len(context.args) > 1 or context.args[0].startswith('@'):
+        await _bulk_restart(update, context)
+        return
+
     target_username = context.args[0].strip()
 
     # Отправляем промежуточный статус "обрабатывается" как временное сообщение
@@ -59,19 +64,23 @@ async def restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Ошибка отправки временного сообщения статуса: {e}")
         status_message = None
 
-    # Выполняем SSH в отдельном потоке
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(
-        None,
-        lambda username: asyncio.run(restart_user_session_on_server(username)),
-        target_username
-    )
+    if restart_queue.enabled:
+        await _queue_restart(update, context, target_username, status_message)
+        return
+
+    # SSH выполняется в собственном пуле потоков, цикл событий не блокируется
+    result = await restart_user_session_on_server(target_username)
 
     # Редактируем временное сообщение с результатом
     if status_message:
         try:
             # Редактируем временное сообщение
-            await status_message.edit_text(result)
+            await edit_coalescer.edit(
+                context.bot,
+                chat_id=status_message.chat_id,
+                message_id=status_message.message_id,
+                text=result
+            )
             # Удаляем временное сообщение после небольшой задержки (опционально)
             # await asyncio.sleep(5)
             # await context.bot.delete_message(chat_id=status_message.chat_id, message_id=status_message.message_id)
@@ -87,4 +96,126 @@ async def restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
         logger.info(f"Сообщение /restart от пользователя {user_id} удалено.")
     except Exception as e:
-        logger.warning(f"Не удалось удалить сообщение /restart {message_id}: {e}")
\ No newline at end of file
+        logger.warning(f"Не удалось удалить сообщение /restart {message_id}: {e}")
+
+
+async def _queue_restart(update: Update, context: ContextTypes.DEFAULT_TYPE, target_username: str, status_message):
+    """Ставит перезапуск в очередь: результат покажет воркер restart_queue в сообщении статуса и основном сообщении."""
+    user_id = update.effective_user.id
+    chat_id = update.effective_chat.id
+    message_id = update.effective_message.message_id
+
+    created = await restart_queue.submit(
+        target_username, user_id, chat_id, status_message.message_id if status_message else None
+    )
+    # Правка ставится в edit_coalescer до первого переключения задач,
+    # поэтому результат воркера её не опередит и не будет перезаписан
+    if created:
+        status_text = f"⏳ Перезапуск сессии '{target_username}' поставлен в очередь. Результат появится здесь."
+    else:
+        status_text = f"⏳ Перезапуск сессии '{target_username}' уже выполняется. Результат появится здесь."
+    await update_main_message(update, context, status_text, is_logged_in=True)
+
+    try:
+        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        logger.info(f"Сообщение /restart от пользователя {user_id} удалено.")
+    except Exception as e:
+        logger.warning(f"Не удалось удалить сообщение /restart {message_id}: {e}")
+
+
+def _expand_targets(args: list[str]) -> tuple[list[str], list[str]]:
+    """Раскрывает группы @имя из RESTART_GROUPS. Возвращает (пользователи без повторов, неизвестные группы)."""
+    users, unknown = [], []
+    for arg in args:
+        arg = arg.strip()
+        if arg.startswith('@'):
+            members = config.RESTART_GROUPS.get(arg[1:].lower())
+            if members is None:
+                unknown.append(arg)
+            else:
+                users.extend(members)
+        elif arg:
+            users.append(arg)
+    return list(dict.fromkeys(users)), unknown
+
+
+def _format_bulk_status(users: list[str], results: dict[str, str]) -> str:
+    done = sum(1 for user in users if user in results)
+    lines = [f"🔄 Массовый перезапуск: {done}/{len(users)}"]
+    lines += [f"{user}: {results.get(user, '⏳')}" for user in users]
+    return "\n".join(lines)
+
+
+async def _bulk_restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Перезапуск сессий нескольких пользователей: прогресс пишется в одно сообщение статуса."""
+    user_id = update.effective_user.id
+    chat_id = update.effective_chat.id
+    message_id = update.effective_message.message_id
+
+    users, unknown = _expand_targets(context.args)
+    if user_id != config.ADMIN_TELEGRAM_ID:
+        status_text = "❌ Массовый перезапуск доступен только администратору."
+    elif unknown:
+        status_text = f"❌ Неизвестные группы: {', '.join(unknown)}"
+    elif not users:
+        status_text = "❌ Не указаны пользователи для перезапуска."
+    else:
+        status_text = None
+    if status_text:
+        try:
+            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        except Exception as e:
+            logger.warning(f"Не удалось удалить сообщение /restart {message_id}: {e}")
+        await update_main_message(update, context, status_text, is_logged_in=True)
+        return
+
+    try:
+        status_message = await update.message.reply_text(_format_bulk_status(users, {}))
+    except Exception as e:
+        logger.error(f"Ошибка отправки временного сообщения статуса: {e}")
+        status_message = None
+
+    async def report(results: dict[str, str]):
+        # Правки одного сообщения склеиваются в edit_coalescer, лимиты Telegram соблюдаются
+        if status_message:
+            try:
+                await edit_coalescer.edit(
+                    context.bot,
+                    chat_id=status_message.chat_id,
+                    message_id=status_message.message_id,
+                    text=_format_bulk_status(users, results)
+                )
+            except Exception as e:
+                logger.error(f"Ошибка обновления статуса массового перезапуска: {e}")
+
+    logger.info(f"Администратор {user_id} запустил массовый перезапуск: {', '.join(users)}")
+    if restart_queue.enabled:
+        # Задача на каждого пользователя: повторы, объединение с уже поставленными перезапусками
+        # и восстановление после остановки бота — как у одиночного /restart. Одновременно выполняется
+        # не больше RESTART_WORKERS задач; RESTART_PARALLELISM действует только без очереди
+        results = {}
+
+        async def restart_one(user: str):
+            try:
+                results[user] = await restart_queue.run(user, user_id, chat_id)
+            except Exception as e:
+                logger.error(f"Не удалось поставить перезапуск {user} в очередь: {e}")
+                results[user] = f"❌ {e}"
+            await report(results)
+
+        await asyncio.gather(*(restart_one(user) for user in users))
+    else:
+        results = await restart_user_sessions(users, on_progress=report)
+    await report(results)
+
+    succeeded = sum(1 for result in results.values() if result.startswith('✅'))
+    await update_main_message(
+        update, context,
+        f"🔄 Массовый перезапуск завершён: {succeeded}/{len(users)}.\n\nВыберите следующее действие:",
+        is_logged_in=True
+    )
+    try:
+        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        logger.info(f"Сообщение /restart от пользователя {user_id} удалено.")
+    except Exception as e:
+        logger.warning(f"Не удалось удалить сообщение /restart {message_id}: {e}")
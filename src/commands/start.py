@@ -1,7 +1,4 @@
-import time
-
-from src.config import config
-from src.db.utils import get_session
+from src.auth import get_session_state
 from telegram import Update
 from telegram.ext import ContextTypes
 
@@ -11,10 +8,8 @@ from src.logger import logger
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    is_admin = (user_id == config.ADMIN_TELEGRAM_ID)
-    # Проверяем, есть ли активная сессия
-    bot_user_id, timestamp = get_session(user_id)
-    is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
+    # Проверяем, есть ли активная сессия (определена один раз для обновления)
+    is_logged_in = (await get_session_state(update, context)).is_logged_in
     if is_logged_in:
         welcome_text = "👋 *Привет!* Вы уже вошли в систему."
     else:
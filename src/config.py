@@ -38,16 +38,122 @@ class AppConfig:
             envLogger.error("PASSWORD_HASH_SECRET is required")
             raise ConfigurationError("PASSWORD_HASH_SECRET is required")
 
+        # Адрес Bot API (пусто — api.telegram.org): локальный telegram-bot-api или заглушка бенчмарков
+        self.TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', '').strip()
+        # Режим получения обновлений: 'polling' или 'webhook'
+        self.RUN_MODE = os.getenv('RUN_MODE', 'polling').strip().lower()
+        # Вебхук: адрес и порт HTTP-сервера бота, публичный URL и секрет заголовка X-Telegram-Bot-Api-Secret-Token.
+        # Без WEBHOOK_CERT/WEBHOOK_KEY сервер слушает обычный HTTP — TLS завершается на обратном прокси
+        self.WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '127.0.0.1')
+        self.WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+        self.WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram').strip('/')
+        self.WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+        self.WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET') or None
+        self.WEBHOOK_CERT = os.getenv('WEBHOOK_CERT') or None
+        self.WEBHOOK_KEY = os.getenv('WEBHOOK_KEY') or None
+        if self.RUN_MODE not in ('polling', 'webhook'):
+            envLogger.error("RUN_MODE must be 'polling' or 'webhook'")
+            raise ConfigurationError("RUN_MODE must be 'polling' or 'webhook'")
+        if self.RUN_MODE == 'webhook' and not self.WEBHOOK_URL:
+            envLogger.error("WEBHOOK_URL is required in webhook mode")
+            raise ConfigurationError("WEBHOOK_URL is required in webhook mode")
+
         # Инициализация остальных атрибутов
         self.DB_NAME = Path(os.environ.get("DB_NAME", "database.db"))
+        self.DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', 5))
+        self.DB_STATEMENT_CACHE = int(os.getenv('DB_STATEMENT_CACHE', 64))
         self.SSH_HOST = os.getenv('SSH_HOST')
         self.SSH_PORT = int(os.getenv('SSH_PORT', 22))
         self.BOT_SSH_USER = os.getenv('BOT_SSH_USER')
         self.BOT_SSH_PASS = os.getenv('BOT_SSH_PASS')
+        # Несколько серверов сессий: SSH_HOSTS="rdp1=10.0.0.1,rdp2=10.0.0.2:2222" (учётка бота общая).
+        # Если не задано — один сервер из SSH_HOST/SSH_PORT
+        self.SSH_HOSTS = self._parse_hosts(os.getenv('SSH_HOSTS', ''), self.SSH_HOST, self.SSH_PORT)
+        if not self.SSH_HOSTS:
+            envLogger.error("SSH_HOST or SSH_HOSTS is required")
+            raise ConfigurationError("SSH_HOST or SSH_HOSTS is required")
+        # Пул SSH-подключений (на каждый сервер)
+        self.SSH_POOL_SIZE = int(os.getenv('SSH_POOL_SIZE', 4))
+        self.SSH_KEEPALIVE = int(os.getenv('SSH_KEEPALIVE', 30))
+        self.SSH_CONNECT_TIMEOUT = float(os.getenv('SSH_CONNECT_TIMEOUT', 10))
+        self.SSH_WORKERS = int(os.getenv('SSH_WORKERS', self.SSH_POOL_SIZE))
+        self.SSH_COMMAND_TIMEOUT = float(os.getenv('SSH_COMMAND_TIMEOUT', 20))
+        # Время жизни снимка таблицы сессий сервера (query session), сек
+        self.SESSION_SNAPSHOT_TTL = float(os.getenv('SESSION_SNAPSHOT_TTL', 5))
+        # Индекс присутствия: период фонового опроса серверов (0 — без опроса) и срок годности снимка, сек.
+        # Индекс только выбирает сервер для поиска сессии, поэтому с одним сервером опрос по умолчанию выключен
+        self.PRESENCE_POLL_INTERVAL = float(os.getenv('PRESENCE_POLL_INTERVAL') or (30 if len(self.SSH_HOSTS) > 1 else 0))
+        self.PRESENCE_MAX_AGE = float(os.getenv('PRESENCE_MAX_AGE', 60))
+        # Массовый перезапуск: число одновременных logoff (только без очереди, RESTART_WORKERS=0;
+        # с очередью одновременность ограничивает RESTART_WORKERS) и именованные группы
+        # RESTART_GROUPS="lab1=user1,user2;lab2=user3" -> /restart @lab1
+        self.RESTART_PARALLELISM = int(os.getenv('RESTART_PARALLELISM', 4))
+        self.RESTART_GROUPS = self._parse_groups(os.getenv('RESTART_GROUPS', ''))
+        # Очередь перезапусков: число воркеров, оно же число одновременных logoff, в том числе
+        # при массовом /restart (0 — перезапуск прямо в обработчике /restart),
+        # попытки с экспоненциальной задержкой (сек) и срок хранения завершённых задач (сек)
+        self.RESTART_WORKERS = int(os.getenv('RESTART_WORKERS', 4))
+        self.RESTART_MAX_ATTEMPTS = int(os.getenv('RESTART_MAX_ATTEMPTS', 3))
+        self.RESTART_RETRY_DELAY = float(os.getenv('RESTART_RETRY_DELAY', 2))
+        self.RESTART_RETRY_MAX_DELAY = float(os.getenv('RESTART_RETRY_MAX_DELAY', 60))
+        self.RESTART_JOB_RETENTION = float(os.getenv('RESTART_JOB_RETENTION', 86400))
         self.SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', 300))
-        #TODO self.PREFER_LANG: Langs = Langs(os.getenv("PREFER_LANG", Langs.RU))
+        # Кеш сессий в памяти
+        self.SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 10000))
+        self.SESSION_WRITE_BEHIND = os.getenv('SESSION_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+        self.SESSION_FLUSH_INTERVAL = float(os.getenv('SESSION_FLUSH_INTERVAL', 5))
+        self.SESSION_REAP_INTERVAL = float(os.getenv('SESSION_REAP_INTERVAL', 60))
+        # Режим логирования: 'detailed' или 'fast'
+        self.LOG_MODE = os.getenv('LOG_MODE', 'detailed').lower()
+        # Правки основного сообщения: окно склейки и лимиты Telegram
+        self.EDIT_DEBOUNCE = float(os.getenv('EDIT_DEBOUNCE', 0.25))
+        self.EDIT_CHAT_INTERVAL = float(os.getenv('EDIT_CHAT_INTERVAL', 1.0))
+        self.EDIT_GLOBAL_RATE = float(os.getenv('EDIT_GLOBAL_RATE', 25))
+        # Обработка обновлений: сколько обработчиков выполняется одновременно (1 — последовательно)
+        # и сколько обновлений может ждать своей очереди
+        self.UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', 16))
+        self.UPDATE_MAX_PENDING = int(os.getenv('UPDATE_MAX_PENDING', 1024))
+        # Хеширование паролей: 'thread' или 'process'
+        self.HASH_WORKERS = int(os.getenv('HASH_WORKERS', 2))
+        self.HASH_EXECUTOR = os.getenv('HASH_EXECUTOR', 'thread').lower()
+        # Проверка изменений файлов локализаций, сек (0 — без перезагрузки на лету)
+        self.LOCALES_RELOAD_INTERVAL = float(os.getenv('LOCALES_RELOAD_INTERVAL', 0))
+        # Язык по умолчанию (код из src.locales.Langs) и кеш выбранных пользователями языков
+        self.PREFER_LANG = os.getenv('PREFER_LANG', 'ru').strip().lower()
+        self.LANG_CACHE_SIZE = int(os.getenv('LANG_CACHE_SIZE', 10000))
+        # HTTP-страница метрик в формате Prometheus (0 — выключена)
+        self.METRICS_LISTEN = os.getenv('METRICS_LISTEN', '127.0.0.1')
+        self.METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+        # Трассировка обновлений в JSONL (пусто — выключена) и ротация файла
+        self.TRACE_FILE = os.getenv('TRACE_FILE', '').strip()
+        self.TRACE_MAX_BYTES = int(os.getenv('TRACE_MAX_BYTES', 10 * 1024 * 1024))
+        self.TRACE_BACKUPS = int(os.getenv('TRACE_BACKUPS', 5))
 
         envLogger.info("Configuration loaded")
 
+    @staticmethod
+    def _parse_hosts(value: str, default_host: str | None, default_port: int) -> list[tuple[str, str, int]]:
+        """Разбирает строку вида 'name=host:port,host2'. Возвращает [(имя, адрес, порт)]."""
+        hosts = []
+        for item in value.split(','):
+            name, _, address = item.strip().rpartition('=')
+            address, _, port = address.partition(':')
+            if address:
+                hosts.append((name or address, address, int(port) if port else default_port))
+        if not hosts and default_host:
+            hosts.append((default_host, default_host, default_port))
+        return hosts
+
+    @staticmethod
+    def _parse_groups(value: str) -> dict[str, list[str]]:
+        """Разбирает строку вида 'group=user1,user2;group2=user3'."""
+        groups = {}
+        for item in value.split(';'):
+            name, _, users = item.partition('=')
+            members = [user.strip() for user in users.split(',') if user.strip()]
+            if name.strip() and members:
+                groups[name.strip().lower()] = members
+        return groups
+
 
 config = AppConfig()
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Асинхронная обёртка над src.db.utils.
+Все запросы выполняются в одном выделенном потоке БД через очередь,
+поэтому задержки записи на диск не останавливают цикл событий.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from src.config import config
+from src.db import utils
+from src.db.hashing import password_hasher
+from src.db.language_cache import NOT_CACHED, LanguageCache
+from src.db.session_cache import SessionCache
+from src.locales import Langs
+from src.logger import dbActiveSessionsLogger
+from src.metrics import ExecutorLoad, metrics
+from src.tracing import span
+
+# Один поток — одно долгоживущее подключение и последовательная очередь запросов
+_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+_db_load = ExecutorLoad()
+
+# Сессии читаются из памяти; запись в active_sessions идёт сквозь кеш
+session_cache = SessionCache(max_size=config.SESSION_CACHE_SIZE, write_behind=config.SESSION_WRITE_BEHIND)
+# Выбранные языки пользователей: запрос в БД только при первом обращении к пользователю
+language_cache = LanguageCache(max_size=config.LANG_CACHE_SIZE)
+
+
+DB_QUERY_SECONDS = metrics.histogram(
+    "bot_db_query_seconds", "Выполнение запросов к SQLite в потоке БД (без ожидания очереди)", ("query",))
+DB_WAIT_SECONDS = metrics.histogram(
+    "bot_db_wait_seconds", "Запрос к БД от постановки в очередь до результата", ("query",))
+
+
+def _timed(func, *args):
+    with DB_QUERY_SECONDS.time(func.__name__):
+        return func(*args)
+
+
+async def run_db(func, *args):
+    """Выполняет синхронную функцию работы с БД в потоке БД."""
+    with DB_WAIT_SECONDS.time(func.__name__), span("db." + func.__name__):
+        return await asyncio.wrap_future(_db_load.submit(_db_executor, _timed, func, *args))
+
+
+async def register_bot_user(telegram_id: int, username: str, password: str) -> bool:
+    """Регистрирует нового пользователя бота. Возвращает True, если успешно."""
+    password_hash, salt = await password_hasher.hash(password)
+    return await run_db(utils.add_bot_user, telegram_id, username, password_hash, salt)
+
+
+async def get_user_status(telegram_id: int) -> str | None:
+    """Получает статус пользователя по Telegram ID."""
+    return await run_db(utils.get_user_status, telegram_id)
+
+
+async def approve_user(telegram_id: int):
+    """Одобряет пользователя, меняя статус на 'active'."""
+    await run_db(utils.approve_user, telegram_id)
+
+
+async def get_user_language(telegram_id: int) -> Langs | None:
+    """Получает выбранный пользователем язык (или None). Обычно без обращения к БД."""
+    lang = language_cache.get(telegram_id)
+    if lang is NOT_CACHED:
+        code = await run_db(utils.get_user_language, telegram_id)
+        try:
+            lang = Langs(code) if code else None
+        except ValueError:
+            lang = None  # Язык, которого больше нет в Langs
+        language_cache.put(telegram_id, lang)
+    return lang
+
+
+async def set_user_language(telegram_id: int, lang: Langs) -> bool:
+    """Сохраняет язык пользователя. Возвращает False, если пользователь не зарегистрирован."""
+    saved = await run_db(utils.set_user_language, telegram_id, lang.value)
+    if saved:
+        language_cache.put(telegram_id, lang)
+    return saved
+
+
+async def authenticate_user(username: str, password: str) -> tuple[int | None, int | None]:
+    """
+    Аутентифицирует пользователя по логину и паролю.
+    Возвращает (telegram_id, bot_user_id) если успешно, иначе (None, None).
+    """
+    row = await run_db(utils.get_user_credentials, username)
+    if row:
+        bot_user_id, telegram_id, stored_hash, salt = row
+        # Хеш считается в пуле хеширования, цикл событий не блокируется
+        if await password_hasher.verify(password, salt, stored_hash):
+            return telegram_id, bot_user_id
+    return None, None
+
+
+async def is_user_active(telegram_id: int) -> bool:
+    """Проверяет, активен ли пользователь по Telegram ID."""
+    return await run_db(utils.is_user_active, telegram_id)
+
+
+async def create_session(telegram_id: int, bot_user_id: int):
+    """Создаёт или обновляет сессию пользователя."""
+    timestamp = time.time()
+    # Продление уже закешированной сессии может быть отложено до пакетной записи
+    if session_cache.refresh(telegram_id, bot_user_id, timestamp):
+        return
+    await run_db(utils.create_session, telegram_id, bot_user_id, timestamp)
+    session_cache.put(telegram_id, bot_user_id, timestamp)
+
+
+async def get_session(telegram_id: int) -> tuple[int | None, float | None]:
+    """Получает (bot_user_id, timestamp) сессии или (None, None). Обычно без обращения к БД."""
+    row = session_cache.get(telegram_id)
+    if row is not None:
+        return row
+    row = await run_db(utils.get_session, telegram_id)
+    session_cache.load(telegram_id, *row)
+    return session_cache.get(telegram_id) or row
+
+
+async def delete_session(telegram_id: int):
+    """Удаляет сессию пользователя."""
+    session_cache.invalidate(telegram_id)
+    await run_db(utils.delete_session, telegram_id)
+
+
+async def cleanup_expired_sessions() -> int:
+    """Удаляет истёкшие сессии из БД и кеша. Возвращает количество удалённых из БД."""
+    # Сначала записываем отложенные продления, иначе в БД могут «истечь» активные сессии
+    await flush_sessions()
+    session_cache.purge_expired()
+    return await run_db(utils.cleanup_expired_sessions)
+
+
+async def enqueue_restart_job(target: str, telegram_id: int, chat_id: int,
+                              status_message_id: int | None = None) -> tuple[int, bool]:
+    """Ставит перезапуск в очередь или присоединяется к незавершённому. Возвращает (job_id, создана ли задача)."""
+    return await run_db(utils.enqueue_restart_job, target, telegram_id, chat_id, status_message_id)
+
+
+async def claim_restart_job() -> tuple[int, str, int] | None:
+    """Берёт в работу ближайшую готовую задачу перезапуска: (job_id, target, номер попытки) или None."""
+    return await run_db(utils.claim_restart_job)
+
+
+async def get_next_restart_run() -> float | None:
+    """Время ближайшей попытки перезапуска из очереди."""
+    return await run_db(utils.get_next_restart_run)
+
+
+async def retry_restart_job(job_id: int, next_run_at: float, error: str):
+    """Откладывает задачу перезапуска до next_run_at."""
+    await run_db(utils.retry_restart_job, job_id, next_run_at, error)
+
+
+async def finish_restart_job(job_id: int, status: str, result: str) -> list[tuple[int, int, int | None]]:
+    """Завершает задачу перезапуска. Возвращает [(telegram_id, chat_id, status_message_id)] для уведомления."""
+    return await run_db(utils.finish_restart_job, job_id, status, result)
+
+
+async def recover_restart_jobs(retention: float) -> int:
+    """Возвращает в очередь прерванные перезапуски и удаляет старые завершённые."""
+    return await run_db(utils.recover_restart_jobs, retention)
+
+
+@dataclass
+class ReaperStats:
+    """Метрики фоновой очистки сессий."""
+    runs: int = 0
+    reaped_total: int = 0
+    last_reaped: int = 0
+    last_run_at: float | None = None
+
+
+reaper_stats = ReaperStats()
+
+metrics.gauge("bot_db_queue_depth", "Запросы к БД в очереди и выполняющиеся", lambda: _db_load.pending)
+metrics.gauge("bot_session_cache_size", "Сессии в памяти", lambda: len(session_cache))
+SESSION_REAPER_RUNS = metrics.counter("bot_session_reaper_runs_total", "Проходы фоновой очистки сессий")
+SESSIONS_REAPED = metrics.counter("bot_sessions_reaped_total", "Истёкшие сессии, удалённые фоновой очисткой")
+metrics.gauge("bot_session_reaper_last_reaped", "Сессии, удалённые последним проходом очистки",
+              lambda: reaper_stats.last_reaped)
+
+
+async def run_session_reaper(interval: float = config.SESSION_REAP_INTERVAL):
+    """Фоновая задача: периодически удаляет истёкшие сессии вместо очистки в каждом обработчике."""
+    while True:
+        try:
+            reaped = await cleanup_expired_sessions()
+            reaper_stats.runs += 1
+            reaper_stats.last_reaped = reaped
+            reaper_stats.reaped_total += reaped
+            reaper_stats.last_run_at = time.time()
+            SESSION_REAPER_RUNS.inc()
+            SESSIONS_REAPED.inc(amount=reaped)
+        except Exception as e:
+            dbActiveSessionsLogger.error(f"Ошибка фоновой очистки сессий: {e}")
+        await asyncio.sleep(interval)
+
+
+async def flush_sessions():
+    """Записывает отложенные продления сессий одной транзакцией."""
+    batch = session_cache.take_dirty()
+    if batch:
+        await run_db(utils.touch_sessions, batch)
+
+
+async def run_session_flusher(interval: float = config.SESSION_FLUSH_INTERVAL):
+    """Фоновая задача: периодически сбрасывает отложенные продления сессий в БД."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_sessions()
+        except Exception as e:
+            dbActiveSessionsLogger.error(f"Ошибка записи отложенных продлений сессий: {e}")
+
+
+def shutdown_db():
+    """Дожидается выполнения очереди запросов и закрывает подключения."""
+    _db_executor.shutdown(wait=True)
+    utils.close_db_connections()
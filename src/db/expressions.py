@@ -11,7 +11,8 @@ class DatabaseExpressions:
                 password_hash TEXT NOT NULL, -- Хеш пароля
                 salt TEXT NOT NULL, -- Соль для хеширования
                 status TEXT NOT NULL DEFAULT 'pending', -- 'pending', 'active', 'banned'
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                language TEXT -- Выбранный язык интерфейса ('ru', 'en') или NULL
             )
         ''')
 
@@ -24,14 +25,86 @@ class DatabaseExpressions:
             )
         ''')
 
+    # Индекс по времени сессии: удаление истёкших сессий — поиск по диапазону, а не полный проход
+    INIT_SESSIONS_TIMESTAMP_INDEX =\
+        "CREATE INDEX IF NOT EXISTS idx_active_sessions_timestamp ON active_sessions (timestamp)"
+
+    # Очередь перезапусков: переживает остановку бота; для одного пользователя на сервере
+    # не больше одной незавершённой задачи (частичный уникальный индекс)
+    INIT_RESTART_JOBS = ('''
+            CREATE TABLE IF NOT EXISTS restart_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target TEXT NOT NULL, -- Пользователь на сервере (в нижнем регистре)
+                status TEXT NOT NULL DEFAULT 'pending', -- 'pending', 'running', 'done', 'failed'
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL, -- Время следующей попытки
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                result TEXT -- Результат (или последняя ошибка) для пользователя
+            )
+        ''')
+    INIT_RESTART_JOBS_ACTIVE_INDEX = (
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_restart_jobs_active ON restart_jobs (target) "
+        "WHERE status IN ('pending', 'running')"
+    )
+    INIT_RESTART_JOBS_DUE_INDEX =\
+        "CREATE INDEX IF NOT EXISTS idx_restart_jobs_due ON restart_jobs (status, next_run_at)"
+    # Кого уведомить о результате: автор задачи и те, чьи запросы к ней присоединились.
+    # Строка на каждый запрос: у повторного /restart того же пользователя своё сообщение статуса
+    INIT_RESTART_JOB_WATCHERS = ('''
+            CREATE TABLE IF NOT EXISTS restart_job_watchers (
+                job_id INTEGER NOT NULL,
+                telegram_id INTEGER NOT NULL,
+                chat_id INTEGER NOT NULL,
+                status_message_id INTEGER, -- Сообщение «перезапускаю...», заменяемое результатом
+                FOREIGN KEY (job_id) REFERENCES restart_jobs (id)
+            )
+        ''')
+    INIT_RESTART_JOB_WATCHERS_INDEX =\
+        "CREATE INDEX IF NOT EXISTS idx_restart_job_watchers_job ON restart_job_watchers (job_id)"
+
+    # Миграция таблиц, созданных до появления колонки language
+    GET_USERS_COLUMNS = "PRAGMA table_info(bot_users)"
+    ADD_USERS_LANGUAGE = "ALTER TABLE bot_users ADD COLUMN language TEXT"
+
     REGISTER_BOT_USER =\
         "INSERT INTO bot_users (telegram_id, username, password_hash, salt, status) VALUES (?, ?, ?, ?, 'pending')"
     GET_USER_STATUS =\
         "SELECT status FROM bot_users WHERE telegram_id = ?"
     APPROVE_USER = "UPDATE bot_users SET status = 'active' WHERE telegram_id = ?"
+    GET_USER_LANGUAGE = "SELECT language FROM bot_users WHERE telegram_id = ?"
+    SET_USER_LANGUAGE = "UPDATE bot_users SET language = ? WHERE telegram_id = ?"
     AUTH_USER =\
         "SELECT id, telegram_id, password_hash, salt FROM bot_users WHERE username = ? AND status = 'active'"
     CREATE_SESSION = "INSERT OR REPLACE INTO active_sessions (telegram_id, bot_user_id, timestamp) VALUES (?, ?, ?)"
     GET_SESSION = "SELECT bot_user_id, timestamp FROM active_sessions WHERE telegram_id = ?"
     DELETE_SESSION = "DELETE FROM active_sessions WHERE telegram_id = ?"
     CLEANUP_EXP_SESSIONS = "DELETE FROM active_sessions WHERE timestamp < ?"
+
+    GET_ACTIVE_RESTART_JOB = "SELECT id FROM restart_jobs WHERE target = ? AND status IN ('pending', 'running')"
+    ADD_RESTART_JOB = (
+        "INSERT INTO restart_jobs (target, status, attempts, next_run_at, created_at, updated_at) "
+        "VALUES (?, 'pending', 0, ?, ?, ?)"
+    )
+    ADD_RESTART_JOB_WATCHER = (
+        "INSERT INTO restart_job_watchers (job_id, telegram_id, chat_id, status_message_id) "
+        "VALUES (?, ?, ?, ?)"
+    )
+    GET_DUE_RESTART_JOB = (
+        "SELECT id, target, attempts FROM restart_jobs WHERE status = 'pending' AND next_run_at <= ? "
+        "ORDER BY next_run_at, id LIMIT 1"
+    )
+    START_RESTART_JOB = "UPDATE restart_jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?"
+    GET_NEXT_RESTART_RUN = "SELECT MIN(next_run_at) FROM restart_jobs WHERE status = 'pending'"
+    RETRY_RESTART_JOB =\
+        "UPDATE restart_jobs SET status = 'pending', next_run_at = ?, result = ?, updated_at = ? WHERE id = ?"
+    FINISH_RESTART_JOB = "UPDATE restart_jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?"
+    GET_RESTART_JOB_WATCHERS =\
+        "SELECT telegram_id, chat_id, status_message_id FROM restart_job_watchers WHERE job_id = ?"
+    # Задачи, прерванные остановкой бота, выполняются заново
+    REQUEUE_RUNNING_RESTART_JOBS = "UPDATE restart_jobs SET status = 'pending', updated_at = ? WHERE status = 'running'"
+    PURGE_RESTART_JOB_WATCHERS = (
+        "DELETE FROM restart_job_watchers WHERE job_id IN "
+        "(SELECT id FROM restart_jobs WHERE status IN ('done', 'failed') AND updated_at < ?)"
+    )
+    PURGE_RESTART_JOBS = "DELETE FROM restart_jobs WHERE status IN ('done', 'failed') AND updated_at < ?"
@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.config import config
+from src.logger import dbUsersLogger
+
+HASH_ITERATIONS = 100000
+
+
+def hash_password(password: str, salt: str, secret: str) -> str:
+    """Считает PBKDF2-хеш пароля. Выполняется в воркере пула, поэтому секрет передаётся явно."""
+    return hashlib.pbkdf2_hmac(
+        'sha256',
+        password.encode('utf-8'),
+        (secret + salt).encode('utf-8'),
+        HASH_ITERATIONS
+    ).hex()
+
+
+class PasswordHasher:
+    """
+    Асинхронный сервис хеширования паролей.
+    PBKDF2 считается в пуле потоков или процессов, чтобы вход и регистрация
+    не останавливали цикл событий для остальных чатов.
+    """
+
+    def __init__(self, workers: int = 2, use_processes: bool = False, secret: str = ""):
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self._secret = secret
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        # Пул создаётся лениво: процессы не нужны, пока никто не входит
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+            dbUsersLogger.info(
+                f"Пул хеширования запущен: {self.workers} {'процессов' if self.use_processes else 'потоков'}"
+            )
+        return self._executor
+
+    async def hash(self, password: str) -> tuple[str, str]:
+        """Хеширует пароль с новой солью. Возвращает (password_hash, salt)."""
+        salt = secrets.token_hex(16)
+        loop = asyncio.get_running_loop()
+        password_hash = await loop.run_in_executor(self._get_executor(), hash_password, password, salt, self._secret)
+        return password_hash, salt
+
+    async def verify(self, password: str, salt: str, stored_hash: str) -> bool:
+        """Проверяет пароль против сохранённого хеша."""
+        loop = asyncio.get_running_loop()
+        password_hash = await loop.run_in_executor(self._get_executor(), hash_password, password, salt, self._secret)
+        return secrets.compare_digest(password_hash, stored_hash)  # Безопасное сравнение
+
+    def shutdown(self):
+        """Останавливает пул хеширования."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=config.HASH_WORKERS,
+    use_processes=config.HASH_EXECUTOR == 'process',
+    secret=config.PASSWORD_HASH_SECRET,
+)
@@ -0,0 +1,41 @@
+import threading
+from collections import OrderedDict
+
+from src.locales import Langs
+
+# Маркер отсутствия записи в кеше (None — закешированное «язык не выбран»)
+NOT_CACHED = object()
+
+
+class LanguageCache:
+    """
+    LRU-кеш выбранных языков: telegram_id -> Langs или None (язык не выбран).
+    Заполняется при первом обращении к пользователю, обновляется при смене языка.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max(1, max_size)
+        self._langs: OrderedDict[int, Langs | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, telegram_id: int):
+        """Возвращает Langs, None (язык не выбран) или NOT_CACHED, если записи нет."""
+        with self._lock:
+            lang = self._langs.get(telegram_id, NOT_CACHED)
+            if lang is not NOT_CACHED:
+                self._langs.move_to_end(telegram_id)
+            return lang
+
+    def put(self, telegram_id: int, lang: Langs | None):
+        with self._lock:
+            self._langs[telegram_id] = lang
+            self._langs.move_to_end(telegram_id)
+            while len(self._langs) > self.max_size:
+                self._langs.popitem(last=False)
+
+    def invalidate(self, telegram_id: int):
+        with self._lock:
+            self._langs.pop(telegram_id, None)
+
+    def __len__(self) -> int:
+        return len(self._langs)
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.config import config
+
+# Кешированная запись: (bot_user_id, timestamp); (None, None) — сессии нет
+SessionRow = tuple[int | None, float | None]
+_NO_SESSION: SessionRow = (None, None)
+
+
+class SessionCache:
+    """
+    Write-through кеш таблицы active_sessions в памяти.
+    Поиск за O(1), истёкшие записи удаляются лениво при обращении,
+    размер ограничен (вытесняются давно не использованные записи).
+    В режиме write_behind продление существующей сессии только помечает
+    запись, а в БД такие продления пишутся пачкой через take_dirty().
+    """
+
+    def __init__(self, max_size: int = 10000, write_behind: bool = False):
+        self.max_size = max(1, max_size)
+        self.write_behind = write_behind
+        self._rows: OrderedDict[int, SessionRow] = OrderedDict()
+        self._dirty: dict[int, tuple[int, float]] = {}  # Отложенные продления
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _expired(row: SessionRow, now: float) -> bool:
+        return row[0] is not None and now - row[1] >= config.SESSION_TIMEOUT
+
+    def get(self, telegram_id: int) -> SessionRow | None:
+        """Возвращает сессию из кеша, (None, None) если её нет, или None, если запись не закеширована."""
+        with self._lock:
+            row = self._rows.get(telegram_id)
+            if row is None:
+                return None
+            if self._expired(row, time.time()):
+                # Ленивое истечение: сессия всё равно недействительна
+                row = self._rows[telegram_id] = _NO_SESSION
+                self._dirty.pop(telegram_id, None)
+            self._rows.move_to_end(telegram_id)
+            return row
+
+    def load(self, telegram_id: int, bot_user_id: int | None, timestamp: float | None):
+        """Кеширует строку, прочитанную из БД. Отложенное продление новее строки из БД и имеет приоритет."""
+        with self._lock:
+            pending = self._dirty.get(telegram_id)
+            if pending is not None and pending[0] == bot_user_id:
+                bot_user_id, timestamp = pending
+            self._store(telegram_id, bot_user_id, timestamp)
+
+    def put(self, telegram_id: int, bot_user_id: int | None, timestamp: float | None):
+        """Кеширует сессию, только что записанную в БД."""
+        with self._lock:
+            self._dirty.pop(telegram_id, None)
+            self._store(telegram_id, bot_user_id, timestamp)
+
+    def _store(self, telegram_id: int, bot_user_id: int | None, timestamp: float | None):
+        self._rows[telegram_id] = (bot_user_id, timestamp) if bot_user_id is not None else _NO_SESSION
+        self._rows.move_to_end(telegram_id)
+        self._evict()
+
+    def refresh(self, telegram_id: int, bot_user_id: int, timestamp: float) -> bool:
+        """
+        Продлевает закешированную сессию без записи в БД (только в режиме write_behind).
+        Возвращает False, если запись нужно сделать сразу.
+        """
+        if not self.write_behind:
+            return False
+        with self._lock:
+            row = self._rows.get(telegram_id)
+            if row is None or row[0] != bot_user_id or self._expired(row, timestamp):
+                return False
+            self._rows[telegram_id] = (bot_user_id, timestamp)
+            self._rows.move_to_end(telegram_id)
+            self._dirty[telegram_id] = (bot_user_id, timestamp)
+            return True
+
+    def invalidate(self, telegram_id: int):
+        """Отмечает, что сессии больше нет (после удаления из БД)."""
+        self.put(telegram_id, None, None)
+
+    def take_dirty(self) -> list[tuple[int, int, float]]:
+        """Забирает отложенные продления для пакетной записи: [(telegram_id, bot_user_id, timestamp)]."""
+        with self._lock:
+            batch = [(tid, bot_user_id, timestamp) for tid, (bot_user_id, timestamp) in self._dirty.items()]
+            self._dirty.clear()
+            return batch
+
+    def purge_expired(self) -> int:
+        """Удаляет истёкшие записи. Возвращает их количество."""
+        now = time.time()
+        with self._lock:
+            expired = [tid for tid, row in self._rows.items() if self._expired(row, now)]
+            for tid in expired:
+                self._rows[tid] = _NO_SESSION
+                self._dirty.pop(tid, None)
+            return len(expired)
+
+    def _evict(self):
+        # Вытесняем давно не использованные записи; отложенные продления хранятся отдельно и не теряются
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._rows)
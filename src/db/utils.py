@@ -1,6 +1,5 @@
-import hashlib
-import secrets
 import sqlite3
+import threading
 import time
 from contextlib import contextmanager
 
@@ -9,31 +8,77 @@ from src.db.expressions import DatabaseExpressions
 from src.logger import dbAnyLogger, dbUsersLogger, dbActiveSessionsLogger
 
 
+# Одно долгоживущее подключение на поток: подготовленные выражения из
+# DatabaseExpressions остаются в кеше sqlite3 между вызовами
+_local = threading.local()
+_connections: list[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+
+
+def _open_connection() -> sqlite3.Connection:
+    """Открывает подключение и настраивает журнал WAL."""
+    conn = sqlite3.connect(
+        config.DB_NAME,
+        timeout=config.DB_BUSY_TIMEOUT,
+        cached_statements=config.DB_STATEMENT_CACHE,
+        check_same_thread=False,  # Закрывается из основного потока при остановке
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _connections_lock:
+        _connections.append(conn)
+    dbAnyLogger.debug(f"Открыто подключение к БД {config.DB_NAME} для потока {threading.current_thread().name}")
+    return conn
+
 @contextmanager
 def get_db_connection():
-    """Контекстный менеджер для подключения к БД."""
-    conn = sqlite3.connect(config.DB_NAME)
+    """Контекстный менеджер для подключения к БД (переиспользует подключение потока)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _open_connection()
     try:
         yield conn
-    finally:
-        conn.close()
+    except BaseException:
+        # Не оставляем незавершённую транзакцию в общем подключении
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+def close_db_connections():
+    """Закрывает все открытые подключения к БД (при остановке бота)."""
+    with _connections_lock:
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _connections.clear()
+    _local.__dict__.pop("conn", None)
 
 def init_db():
-    """Создаёт таблицы пользователей и сессий, если их нет."""
+    """Создаёт таблицы пользователей, сессий и очереди перезапусков, если их нет."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
         # Таблица пользователей бота
         cursor.execute(DatabaseExpressions.INIT_USERS)
+        columns = {row[1] for row in cursor.execute(DatabaseExpressions.GET_USERS_COLUMNS)}
+        if 'language' not in columns:
+            cursor.execute(DatabaseExpressions.ADD_USERS_LANGUAGE)
         # Таблица активных сессий бота (временно хранит данные пользователя)
         cursor.execute(DatabaseExpressions.INIT_SESSIONS)
+        cursor.execute(DatabaseExpressions.INIT_SESSIONS_TIMESTAMP_INDEX)
+        # Очередь перезапусков сессий
+        cursor.execute(DatabaseExpressions.INIT_RESTART_JOBS)
+        cursor.execute(DatabaseExpressions.INIT_RESTART_JOBS_ACTIVE_INDEX)
+        cursor.execute(DatabaseExpressions.INIT_RESTART_JOBS_DUE_INDEX)
+        cursor.execute(DatabaseExpressions.INIT_RESTART_JOB_WATCHERS)
+        cursor.execute(DatabaseExpressions.INIT_RESTART_JOB_WATCHERS_INDEX)
         conn.commit()
         dbAnyLogger.info("База данных инициализирована.")
 
-def register_bot_user(telegram_id: int, username: str, password: str) -> bool:
-    """Регистрирует нового пользователя бота. Возвращает True, если успешно."""
+def add_bot_user(telegram_id: int, username: str, password_hash: str, salt: str) -> bool:
+    """Добавляет заявку пользователя бота с готовым хешем пароля. Возвращает True, если успешно."""
     try:
-        salt = secrets.token_hex(16)
-        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), (config.PASSWORD_HASH_SECRET + salt).encode('utf-8'), 100000).hex()
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
@@ -61,26 +106,28 @@ def approve_user(telegram_id: int):
         cursor.execute(DatabaseExpressions.APPROVE_USER, (telegram_id,))
         conn.commit()
 
-def authenticate_user(username: str, password: str) -> tuple[int | None, int | None]:
-    """
-    Аутентифицирует пользователя по логину и паролю.
-    Возвращает (telegram_id, bot_user_id) если успешно, иначе (None, None).
-    """
+def get_user_language(telegram_id: int) -> str | None:
+    """Получает код выбранного пользователем языка или None, если язык не выбран (или пользователя нет)."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(DatabaseExpressions.AUTH_USER, (username,))
+        cursor.execute(DatabaseExpressions.GET_USER_LANGUAGE, (telegram_id,))
         row = cursor.fetchone()
-        if row:
-            bot_user_id, telegram_id, stored_hash, salt = row
-            password_hash = hashlib.pbkdf2_hmac(
-                'sha256',
-                password.encode('utf-8'),
-                (config.PASSWORD_HASH_SECRET + salt).encode('utf-8'),
-                100000
-            ).hex()
-            if secrets.compare_digest(password_hash, stored_hash): # Безопасное сравнение
-                return telegram_id, bot_user_id
-    return None, None
+        return row[0] if row else None
+
+def set_user_language(telegram_id: int, language: str | None) -> bool:
+    """Сохраняет язык пользователя. Возвращает False, если пользователь не зарегистрирован."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.SET_USER_LANGUAGE, (language, telegram_id))
+        conn.commit()
+        return cursor.rowcount > 0
+
+def get_user_credentials(username: str) -> tuple[int, int, str, str] | None:
+    """Возвращает (bot_user_id, telegram_id, password_hash, salt) активного пользователя или None."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.AUTH_USER, (username,))
+        return cursor.fetchone()
 
 def is_user_active(telegram_id: int) -> bool:
     """Проверяет, активен ли пользователь по Telegram ID."""
@@ -88,9 +135,9 @@ def is_user_active(telegram_id: int) -> bool:
     return status == 'active'
 
 # --- Функции работы с БД (Сессии) ---
-def create_session(telegram_id: int, bot_user_id: int):
+def create_session(telegram_id: int, bot_user_id: int, timestamp: float | None = None):
     """Создаёт или обновляет сессию пользователя."""
-    timestamp = time.time()
+    timestamp = time.time() if timestamp is None else timestamp
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
@@ -99,6 +146,15 @@ def create_session(telegram_id: int, bot_user_id: int):
         )
         conn.commit()
 
+def touch_sessions(sessions: list[tuple[int, int, float]]):
+    """Пакетно записывает продления сессий [(telegram_id, bot_user_id, timestamp)] одной транзакцией."""
+    if not sessions:
+        return
+    with get_db_connection() as conn:
+        conn.executemany(DatabaseExpressions.CREATE_SESSION, sessions)
+        conn.commit()
+    dbActiveSessionsLogger.debug(f"Записано {len(sessions)} отложенных продлений сессий.")
+
 def get_session(telegram_id: int) -> tuple[int | None, float | None]:
     """Получает ID пользователя бота и временную метку сессии. Возвращает (bot_user_id, timestamp) или (None, None)."""
     with get_db_connection() as conn:
@@ -117,8 +173,8 @@ def delete_session(telegram_id: int):
         cursor.execute(DatabaseExpressions.DELETE_SESSION, (telegram_id,))
         conn.commit()
 
-def cleanup_expired_sessions():
-    """Удаляет истёкшие сессии из БД."""
+def cleanup_expired_sessions() -> int:
+    """Удаляет истёкшие сессии из БД. Возвращает количество удалённых."""
     now = time.time()
     expired_time = now - config.SESSION_TIMEOUT
     with get_db_connection() as conn:
@@ -131,6 +187,84 @@ def cleanup_expired_sessions():
         conn.commit()
         if deleted_count > 0:
             dbActiveSessionsLogger.info(f"Удалено {deleted_count} истёкших сессий.")
+        return deleted_count
+
+# --- Функции работы с БД (Очередь перезапусков) ---
+def enqueue_restart_job(target: str, telegram_id: int, chat_id: int,
+                        status_message_id: int | None = None) -> tuple[int, bool]:
+    """
+    Ставит перезапуск сессии target в очередь, а пользователя — в список уведомляемых.
+    Если для target уже есть незавершённая задача, присоединяется к ней.
+    Возвращает (job_id, создана ли новая задача).
+    """
+    now = time.time()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.GET_ACTIVE_RESTART_JOB, (target,))
+        row = cursor.fetchone()
+        created = row is None
+        if created:
+            cursor.execute(DatabaseExpressions.ADD_RESTART_JOB, (target, now, now, now))
+            job_id = cursor.lastrowid
+        else:
+            job_id = row[0]
+        cursor.execute(DatabaseExpressions.ADD_RESTART_JOB_WATCHER, (job_id, telegram_id, chat_id, status_message_id))
+        conn.commit()
+        return job_id, created
+
+def claim_restart_job(now: float | None = None) -> tuple[int, str, int] | None:
+    """Берёт в работу ближайшую готовую задачу. Возвращает (job_id, target, номер попытки) или None."""
+    now = time.time() if now is None else now
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.GET_DUE_RESTART_JOB, (now,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        job_id, target, attempts = row
+        cursor.execute(DatabaseExpressions.START_RESTART_JOB, (now, job_id))
+        conn.commit()
+        return job_id, target, attempts + 1
+
+def get_next_restart_run() -> float | None:
+    """Время ближайшей попытки среди ожидающих задач или None, если очередь пуста."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.GET_NEXT_RESTART_RUN)
+        return cursor.fetchone()[0]
+
+def retry_restart_job(job_id: int, next_run_at: float, error: str):
+    """Возвращает задачу в очередь до времени next_run_at."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.RETRY_RESTART_JOB, (next_run_at, error, time.time(), job_id))
+        conn.commit()
+
+def finish_restart_job(job_id: int, status: str, result: str) -> list[tuple[int, int, int | None]]:
+    """Завершает задачу ('done' или 'failed'). Возвращает уведомляемых: [(telegram_id, chat_id, status_message_id)]."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.FINISH_RESTART_JOB, (status, result, time.time(), job_id))
+        conn.commit()
+        cursor.execute(DatabaseExpressions.GET_RESTART_JOB_WATCHERS, (job_id,))
+        return cursor.fetchall()
+
+def recover_restart_jobs(retention: float) -> int:
+    """
+    При запуске: возвращает в очередь задачи, прерванные остановкой бота, и удаляет
+    завершённые задачи старше retention секунд. Возвращает число возвращённых задач.
+    """
+    now = time.time()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DatabaseExpressions.REQUEUE_RUNNING_RESTART_JOBS, (now,))
+        requeued = cursor.rowcount
+        cursor.execute(DatabaseExpressions.PURGE_RESTART_JOB_WATCHERS, (now - retention,))
+        cursor.execute(DatabaseExpressions.PURGE_RESTART_JOBS, (now - retention,))
+        conn.commit()
+        if requeued:
+            dbAnyLogger.info(f"Возвращено в очередь {requeued} прерванных перезапусков.")
+        return requeued
 
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from telegram import Bot, InlineKeyboardMarkup
+from telegram.error import BadRequest, RetryAfter
+
+from src.config import config
+from src.logger import logger
+from src.metrics import TELEGRAM_API_SECONDS, metrics
+
+MessageKey = tuple[int, int]  # (chat_id, message_id)
+
+
+class _PendingEdit:
+    """Последнее запрошенное состояние сообщения, ожидающее отправки."""
+    __slots__ = ("text", "reply_markup", "parse_mode", "future")
+
+    def __init__(self, text: str, reply_markup: InlineKeyboardMarkup | None, parse_mode: str | None,
+                 future: asyncio.Future):
+        self.text = text
+        self.reply_markup = reply_markup
+        self.parse_mode = parse_mode
+        self.future = future
+
+
+class EditCoalescer:
+    """
+    Объединяет частые правки одного сообщения в одну отправку.
+    Первая правка свободного сообщения не ждёт окна debounce (и уходит сразу,
+    если слот чата свободен); правки, пришедшие, пока предыдущая ждёт отправки
+    или отправляется, склеиваются в окне debounce (отправляется последняя)
+    и уходят после неё. Правки без изменений текста и клавиатуры пропускаются,
+    а лимиты Telegram для чата и для бота в целом соблюдаются всегда: при
+    исчерпании лимита правка ждёт в очереди, а не завершается ошибкой.
+    """
+
+    def __init__(self, debounce: float = 0.25, per_chat_interval: float = 1.0, global_rate: float = 25,
+                 max_retries: int = 3, remember: int = 10000):
+        self.debounce = debounce
+        self.per_chat_interval = per_chat_interval
+        self.global_rate = global_rate
+        self.max_retries = max_retries
+        self._remember = remember
+
+        self._pending: dict[MessageKey, _PendingEdit] = {}
+        # Задачи, отправляющие правку сообщения прямо сейчас
+        self._sending: dict[MessageKey, asyncio.Task] = {}
+        # Последнее отправленное состояние сообщения: (text, reply_markup)
+        self._last_sent: OrderedDict[MessageKey, tuple[str, InlineKeyboardMarkup | None]] = OrderedDict()
+        self._chat_next_at: dict[int, float] = {}
+        self._tokens = float(global_rate)
+        self._tokens_at = time.monotonic()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def edit(self, bot: Bot, chat_id: int, message_id: int, text: str,
+                   reply_markup: InlineKeyboardMarkup | None = None, parse_mode: str | None = None):
+        """
+        Ставит правку сообщения в очередь и ждёт её отправки (или отправки более новой правки).
+        Ошибки Telegram пробрасываются вызывающему, как при прямом edit_message_text.
+        """
+        key = (chat_id, message_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            sending = self._sending.get(key)
+            if sending is None and self._last_sent.get(key) == (text, reply_markup):
+                logger.debug(f"Сообщение {message_id} в чате {chat_id} не изменилось, правка пропущена.")
+                return
+            future = asyncio.get_running_loop().create_future()
+            pending = self._pending[key] = _PendingEdit(text, reply_markup, parse_mode, future)
+            task = asyncio.create_task(self._flush(bot, key, after=sending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            # Более новая правка заменяет ожидающую
+            pending.text, pending.reply_markup, pending.parse_mode = text, reply_markup, parse_mode
+        await asyncio.shield(pending.future)
+
+    @property
+    def pending(self) -> int:
+        """Сообщения с правками, ожидающими отправки."""
+        return len(self._pending)
+
+    def forget(self, chat_id: int, message_id: int):
+        """Забывает состояние сообщения (например, если оно удалено)."""
+        self._last_sent.pop((chat_id, message_id), None)
+
+    async def _flush(self, bot: Bot, key: MessageKey, after: asyncio.Task | None = None):
+        """
+        Отправляет ожидающую правку в пределах лимита чата. Если сообщение свободно (after is None),
+        правка не ждёт окна debounce, иначе склеивается в нём и отправляется после предыдущей (after).
+        """
+        chat_id, message_id = key
+        try:
+            if after is None:
+                # Свободное сообщение: без склейки; если слот чата свободен, отправка уходит сразу
+                await self._wait_chat_slot(chat_id)
+            else:
+                await asyncio.sleep(self.debounce)
+                await asyncio.wait({after})
+                await self._wait_chat_slot(chat_id)
+            await self._wait_global_token()
+        except asyncio.CancelledError:
+            self._pending.pop(key).future.cancel()
+            raise
+        # Берём самое свежее состояние: новые правки после этого момента пойдут отдельной отправкой
+        pending = self._pending.pop(key)
+        self._sending[key] = asyncio.current_task()
+        try:
+            if self._last_sent.get(key) != (pending.text, pending.reply_markup):
+                await self._send(bot, key, pending)
+        except Exception as e:
+            self.forget(chat_id, message_id)
+            pending.future.set_exception(e)
+            pending.future.exception()  # Ошибку обрабатывают ожидающие, не логируем «never retrieved»
+        else:
+            pending.future.set_result(None)
+        finally:
+            if self._sending.get(key) is asyncio.current_task():
+                del self._sending[key]
+
+    async def _send(self, bot: Bot, key: MessageKey, pending: _PendingEdit):
+        chat_id, message_id = key
+        for attempt in range(self.max_retries + 1):
+            try:
+                with TELEGRAM_API_SECONDS.time("editMessageText"):
+                    await bot.edit_message_text(
+                        chat_id=chat_id,
+                        message_id=message_id,
+                        text=pending.text,
+                        reply_markup=pending.reply_markup,
+                        parse_mode=pending.parse_mode
+                    )
+                break
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+                logger.warning(f"Лимит Telegram для чата {chat_id}, повтор правки через {delay} сек.")
+                await asyncio.sleep(delay)
+            except BadRequest as e:
+                # Сообщение уже в нужном состоянии — это не ошибка
+                if "message is not modified" not in str(e).lower():
+                    raise
+                break
+        self._last_sent[key] = (pending.text, pending.reply_markup)
+        self._last_sent.move_to_end(key)
+        while len(self._last_sent) > self._remember:
+            self._last_sent.popitem(last=False)
+
+    async def _wait_chat_slot(self, chat_id: int):
+        """Резервирует ближайший слот отправки в чате (не чаще per_chat_interval)."""
+        now = time.monotonic()
+        slot = max(now, self._chat_next_at.get(chat_id, 0.0))
+        self._chat_next_at[chat_id] = slot + self.per_chat_interval
+        if len(self._chat_next_at) > self._remember:
+            self._chat_next_at = {c: t for c, t in self._chat_next_at.items() if t > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _wait_global_token(self):
+        """Общий лимит отправок бота (token bucket)."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.global_rate, self._tokens + (now - self._tokens_at) * self.global_rate)
+            self._tokens_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.global_rate)
+
+
+edit_coalescer = EditCoalescer(
+    debounce=config.EDIT_DEBOUNCE,
+    per_chat_interval=config.EDIT_CHAT_INTERVAL,
+    global_rate=config.EDIT_GLOBAL_RATE,
+)
+
+metrics.gauge("bot_pending_edits", "Сообщения с правками, ожидающими отправки", lambda: edit_coalescer.pending)
@@ -1,41 +1,101 @@
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+import time
+
+from telegram import Bot, Update, InlineKeyboardMarkup, User
 from telegram.ext import ContextTypes
 
 from src.config import config
+from src.db.async_utils import get_user_language
+from src.edit_coalescer import edit_coalescer
+from src.keyboards import keyboards
+from src.locales import Langs, locales
 from src.logger import logger
+from src.metrics import TELEGRAM_API_SECONDS, metrics
+
+MAIN_MESSAGE_SECONDS = metrics.histogram(
+    "bot_main_message_seconds", "Обновление основного сообщения, включая склейку правок", ("action",))
+MAIN_MESSAGE_ERRORS = metrics.counter(
+    "bot_main_message_errors_total", "Ошибки Telegram при обновлении основного сообщения", ("action", "reason"))
+
+
+async def resolve_language(user: User | None = None, telegram_id: int | None = None) -> Langs:
+    """
+    Язык интерфейса пользователя: выбранный в боте, иначе язык клиента Telegram, иначе язык по умолчанию.
+    Выбранный язык берётся из LRU-кеша, поэтому обычно обходится без запроса к БД.
+    """
+    if user is not None:
+        telegram_id = user.id
+    if telegram_id is not None:
+        lang = await get_user_language(telegram_id)
+        if lang is not None:
+            return lang
+    # language_code приходит в формате IETF: 'ru', 'en-US' и т.п.
+    code = (user.language_code or '').split('-')[0].lower() if user is not None else ''
+    try:
+        return Langs(code)
+    except ValueError:
+        return locales.get_default()
+
+
+async def update_main_message(update: Update, context: ContextTypes.DEFAULT_TYPE, status_text: str, is_logged_in: bool = False,
+                              menu_markup: InlineKeyboardMarkup | None = None, lang: Langs | None = None):
+    """
+    Обновляет основное сообщение бота с новым статусом и меню.
+    Правки идут через edit_coalescer: частые обновления склеиваются, неизменённые пропускаются.
+    menu_markup заменяет главное меню (например, меню настроек).
+    lang — язык меню; если не передан, определяется по пользователю.
+    """
+    if menu_markup is None and lang is None:
+        # Язык уже определён промежуточным обработчиком сессии (src.auth), если он выполнялся
+        state = getattr(context, 'session_state', None)
+        lang = state.lang if state is not None else await resolve_language(update.effective_user)
+    await update_user_main_message(context.bot, context.user_data, update.effective_user.id, update.effective_chat.id,
+                                   status_text, is_logged_in, menu_markup, lang)
 
 
-async def update_main_message(update: Update, context: ContextTypes.DEFAULT_TYPE, status_text: str, is_logged_in: bool = False):
-    """Обновляет основное сообщение бота с новым статусом и меню."""
-    user_id = update.effective_user.id
+async def update_user_main_message(bot: Bot, user_data: dict, user_id: int, chat_id: int, status_text: str,
+                                   is_logged_in: bool = False, menu_markup: InlineKeyboardMarkup | None = None,
+                                   lang: Langs | None = None):
+    """
+    update_main_message без Update — для фоновых задач (например, очереди перезапусков).
+    user_data — данные пользователя из Application.user_data (там хранится основное сообщение).
+    """
     is_admin = (user_id == config.ADMIN_TELEGRAM_ID)
-    menu_markup = get_main_menu(is_logged_in, is_admin)
+    if menu_markup is None:
+        if lang is None:
+            lang = await resolve_language(telegram_id=user_id)
+        menu_markup = get_main_menu(is_logged_in, is_admin, lang)
 
-    # Получаем chat_id и message_id из context.user_data или update
-    chat_id = context.user_data.get('main_menu_chat_id') or update.effective_chat.id
-    message_id = context.user_data.get('main_menu_message_id')
+    # Получаем chat_id и message_id из user_data или переданного чата
+    chat_id = user_data.get('main_menu_chat_id') or chat_id
+    message_id = user_data.get('main_menu_message_id')
 
     # Если message_id известен, пытаемся отредактировать сообщение
     if message_id:
+        started = time.perf_counter()
         try:
-            await context.bot.edit_message_text(
+            await edit_coalescer.edit(
+                bot,
                 chat_id=chat_id,
                 message_id=message_id,
                 text=status_text,
                 reply_markup=menu_markup,
                 parse_mode='Markdown'
             )
+            MAIN_MESSAGE_SECONDS.observe(time.perf_counter() - started, "edit")
             logger.debug(f"Сообщение {message_id} в чате {chat_id} отредактировано.")
             return # Успешно отредактировали, выходим
         except Exception as e:
+            MAIN_MESSAGE_SECONDS.observe(time.perf_counter() - started, "edit")
             error_message = str(e).lower()
             if "message to edit not found" in error_message or "message_id_invalid" in error_message or "message not found" in error_message:
+                MAIN_MESSAGE_ERRORS.inc("edit", "not_found")
                 logger.warning(f"Основное сообщение {message_id} не найдено. Отправляем новое.")
                 # Удаляем устаревшие данные
-                context.user_data.pop('main_menu_message_id', None)
-                context.user_data.pop('main_menu_chat_id', None)
+                user_data.pop('main_menu_message_id', None)
+                user_data.pop('main_menu_chat_id', None)
                 message_id = None # Сбросим message_id, чтобы отправить новое сообщение
             else:
+                MAIN_MESSAGE_ERRORS.inc("edit", type(e).__name__)
                 logger.error(f"Ошибка редактирования основного сообщения {message_id}: {e}")
                 # Даже при ошибке редактирования, не отправляем новое сообщение, если message_id был
                 return
@@ -43,41 +103,28 @@ async def update_main_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     # Если message_id неизвестен или сообщение не найдено, отправляем новое
     # Это происходит при первом запуске или после очистки истории
     try:
-        sent_message = await context.bot.send_message(
-            chat_id=chat_id,
-            text=status_text,
-            reply_markup=menu_markup,
-            parse_mode='Markdown'
-        )
+        with MAIN_MESSAGE_SECONDS.time("send"), TELEGRAM_API_SECONDS.time("sendMessage"):
+            sent_message = await bot.send_message(
+                chat_id=chat_id,
+                text=status_text,
+                reply_markup=menu_markup,
+                parse_mode='Markdown'
+            )
         # Сохраняем ID нового сообщения
-        context.user_data['main_menu_message_id'] = sent_message.message_id
-        context.user_data['main_menu_chat_id'] = sent_message.chat_id
+        user_data['main_menu_message_id'] = sent_message.message_id
+        user_data['main_menu_chat_id'] = sent_message.chat_id
         logger.info(f"Новое основное сообщение {sent_message.message_id} отправлено в чат {sent_message.chat_id}.")
     except Exception as e:
+        MAIN_MESSAGE_ERRORS.inc("send", type(e).__name__)
         logger.error(f"Ошибка отправки нового основного сообщения: {e}")
 
 # ------
 
-def get_main_menu(is_logged_in: bool = False, is_admin: bool = False):
-    keyboard = []
-    if not is_logged_in:
-        keyboard.append([InlineKeyboardButton("🔑 Войти", callback_data='login')])
-        keyboard.append([InlineKeyboardButton("📝 Зарегистрироваться", callback_data='register')])
-    else:
-        keyboard.append([InlineKeyboardButton("🔄 Перезапустить сессию", callback_data='restart')])
-        keyboard.append([InlineKeyboardButton("🚪 Выйти", callback_data='logout')])
-
-    # Добавляем кнопку настроек только для администратора
-    if is_admin:
-        keyboard.append([InlineKeyboardButton("⚙️ Настройки", callback_data='settings')])
-
-    return InlineKeyboardMarkup(keyboard)
+def get_main_menu(is_logged_in: bool = False, is_admin: bool = False, lang: Langs | None = None) -> InlineKeyboardMarkup:
+    """Главное меню из реестра клавиатур (собирается один раз на язык и вариант)."""
+    return keyboards.main_menu(is_logged_in, is_admin, lang)
 
 #-----
-def get_settings_menu():
-    keyboard = [
-        [InlineKeyboardButton(f"⏱️ Таймаут сессии: {config.SESSION_TIMEOUT} сек", callback_data='dummy_info')], # Информационная кнопка
-        [InlineKeyboardButton("✏️ Изменить таймаут", callback_data='change_timeout')],
-        [InlineKeyboardButton("⬅️ Назад", callback_data='back_to_main')],
-    ]
-    return InlineKeyboardMarkup(keyboard)
\ No newline at end of file
+def get_settings_menu(lang: Langs | None = None) -> InlineKeyboardMarkup:
+    """Меню настроек из реестра клавиатур (пересобирается при смене таймаута)."""
+    return keyboards.settings_menu(lang)
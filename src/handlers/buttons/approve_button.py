@@ -1,8 +1,7 @@
-import time
-
+from src.auth import get_session_state
 from src.config import config
-from src.db.utils import get_db_connection, get_session, approve_user
-from src.engine import get_main_menu
+from src.db.async_utils import approve_user, get_user_status
+from src.engine import get_main_menu, resolve_language
 from src.logger import logger
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -19,33 +18,30 @@ async def button_approve_handler(update: Update, context: ContextTypes.DEFAULT_T
         return
 
     data = query.data
+    session = await get_session_state(update, context)
     if data.startswith('approve_'):
         target_telegram_id = int(data.split('_')[1])
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT status FROM bot_users WHERE telegram_id = ?", (target_telegram_id,))
-            row = cursor.fetchone()
+        current_status = await get_user_status(target_telegram_id)
 
-        if not row:
+        if current_status is None:
              status_text = f"❌ Пользователь {target_telegram_id} не найден."
              # Редактируем сообщение админа
-             is_admin_logged_in = get_session(admin_id)[0] is not None and (time.time() - get_session(admin_id)[1]) < config.SESSION_TIMEOUT
-             menu_markup = get_main_menu(is_logged_in=is_admin_logged_in, is_admin=True)
+             menu_markup = get_main_menu(is_logged_in=session.is_logged_in, is_admin=True, lang=session.lang)
              await query.edit_message_text(text=status_text, reply_markup=menu_markup)
              return
 
-        current_status = row[0]
         if current_status == 'active':
             status_text = f"ℹ️ Пользователь {target_telegram_id} уже одобрен."
         elif current_status in ['pending', 'banned']:
-            approve_user(target_telegram_id)
+            await approve_user(target_telegram_id)
             status_text = f"✅ Пользователь {target_telegram_id} одобрен через кнопку."
             try:
                 # Уведомляем пользователя об одобрении (отдельным сообщением)
                 await context.bot.send_message(
                     chat_id=target_telegram_id,
                     text="🎉 Ваша заявка одобрена! Теперь вы можете войти в бота.",
-                    reply_markup=get_main_menu(is_logged_in=False) # Пользователь еще не залогинен
+                    # Пользователь еще не залогинен; меню на его языке
+                    reply_markup=get_main_menu(is_logged_in=False, lang=await resolve_language(telegram_id=target_telegram_id))
                 )
             except Exception as e:
                  logger.warning(f"Не удалось уведомить пользователя {target_telegram_id} об одобрении через кнопку: {e}")
@@ -53,6 +49,5 @@ async def button_approve_handler(update: Update, context: ContextTypes.DEFAULT_T
              status_text = f"❌ Невозможно одобрить пользователя со статусом {current_status}."
 
         # Редактируем сообщение админа
-        is_admin_logged_in = get_session(admin_id)[0] is not None and (time.time() - get_session(admin_id)[1]) < config.SESSION_TIMEOUT
-        menu_markup = get_main_menu(is_logged_in=is_admin_logged_in, is_admin=True)
+        menu_markup = get_main_menu(is_logged_in=session.is_logged_in, is_admin=True, lang=session.lang)
         await query.edit_message_text(text=status_text, reply_markup=menu_markup)
\ No newline at end of file
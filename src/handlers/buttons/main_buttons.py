@@ -1,8 +1,8 @@
-import time
 from telegram import Update
 from telegram.ext import ContextTypes
-from src.config import config
-from src.db.utils import create_session, delete_session, get_session, cleanup_expired_sessions
+from src.auth import get_session_state
+from src.db.async_utils import create_session, delete_session
+from src.edit_coalescer import edit_coalescer
 from src.engine import get_settings_menu, update_main_message
 from src.logger import logger
 
@@ -13,13 +13,10 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     user_id = query.from_user.id
     data = query.data
-    is_admin = (user_id == config.ADMIN_TELEGRAM_ID)
-    # Очистка истёкших сессий
-    cleanup_expired_sessions()
 
-    # Проверяем сессию пользователя
-    bot_user_id, timestamp = get_session(user_id)
-    is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
+    # Сессия пользователя определена один раз для обновления (src.auth)
+    session = await get_session_state(update, context)
+    bot_user_id, is_logged_in, is_admin = session.bot_user_id, session.is_logged_in, session.is_admin
 
     if data == 'register':
         status_text = (
@@ -34,7 +31,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Проверка, если пользователь уже залогинен (по сессии)
         if is_logged_in:
              # Обновляем таймаут
-             create_session(user_id, bot_user_id)
+             await create_session(user_id, bot_user_id)
              status_text = "✅ Вы уже вошли в систему."
              await update_main_message(update, context, status_text, is_logged_in=True)
         else:
@@ -51,7 +48,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update_main_message(update, context, status_text, is_logged_in=False)
             return
         # Обновляем таймаут
-        create_session(user_id, bot_user_id)
+        await create_session(user_id, bot_user_id)
         status_text = (
             "🔄 *Перезапуск сессии*\n\n"
             "Введите имя пользователя на сервере для перезапуска сессии:\n"
@@ -60,7 +57,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update_main_message(update, context, status_text, is_logged_in=True)
 
     elif data == 'logout':
-        delete_session(user_id)
+        await delete_session(user_id)
         status_text = "✅ Вы вышли из системы."
         await update_main_message(update, context, status_text, is_logged_in=False) # Не залогинен
 
@@ -71,18 +68,20 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # await update_main_message(update, context, "❌ Доступ запрещён.", is_logged_in=is_logged_in)
             return
         # Переход в меню настроек
+        lang = session.lang
         settings_text = f"⚙️ *Настройки бота*\n\nТекущие параметры:"
         # Получаем chat_id и message_id из context.user_data или update
         chat_id = context.user_data.get('main_menu_chat_id') or update.effective_chat.id
         message_id = context.user_data.get('main_menu_message_id') or query.message.message_id
 
         try:
-            await context.bot.edit_message_text(
+            await edit_coalescer.edit(
+                context.bot,
                 chat_id=chat_id,
                 message_id=message_id,
                 text=settings_text,
                 parse_mode='Markdown',
-                reply_markup=get_settings_menu()
+                reply_markup=get_settings_menu(lang)
             )
         except Exception as e:
              logger.error(f"Ошибка редактирования сообщения для перехода в настройки: {e}")
@@ -91,7 +90,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                  sent_message = await context.bot.send_message(
                      chat_id=chat_id,
                      text=settings_text,
-                     reply_markup=get_settings_menu(),
+                     reply_markup=get_settings_menu(lang),
                      parse_mode='Markdown'
                  )
                  context.user_data['main_menu_message_id'] = sent_message.message_id
@@ -1,10 +1,9 @@
-import time
-
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from src.auth import get_session_state
 from src.config import config
-from src.db.utils import get_session
+from src.edit_coalescer import edit_coalescer
 from src.engine import get_settings_menu, get_main_menu
 from src.logger import logger
 
@@ -20,6 +19,8 @@ async def settings_button_handler(update: Update, context: ContextTypes.DEFAULT_
         return
 
     data = query.data
+    session = await get_session_state(update, context)
+    lang = session.lang
 
     if data == 'change_timeout':
         # Предлагаем ввести новое значение
@@ -34,12 +35,13 @@ async def settings_button_handler(update: Update, context: ContextTypes.DEFAULT_
         message_id = context.user_data.get('main_menu_message_id') or query.message.message_id
 
         try:
-            await context.bot.edit_message_text(
+            await edit_coalescer.edit(
+                context.bot,
                 chat_id=chat_id,
                 message_id=message_id,
                 text=instruction_text,
                 parse_mode='Markdown',
-                reply_markup=get_settings_menu() # Можно оставить меню, чтобы пользователь мог вернуться
+                reply_markup=get_settings_menu(lang) # Можно оставить меню, чтобы пользователь мог вернуться
             )
         except Exception as e:
              logger.error(f"Ошибка редактирования сообщения для изменения таймаута: {e}")
@@ -48,7 +50,7 @@ async def settings_button_handler(update: Update, context: ContextTypes.DEFAULT_
                  sent_message = await context.bot.send_message(
                      chat_id=chat_id,
                      text=instruction_text,
-                     reply_markup=get_settings_menu(),
+                     reply_markup=get_settings_menu(lang),
                      parse_mode='Markdown'
                  )
                  context.user_data['main_menu_message_id'] = sent_message.message_id
@@ -59,9 +61,7 @@ async def settings_button_handler(update: Update, context: ContextTypes.DEFAULT_
     elif data == 'back_to_main':
         # Возврат в главное меню
         # Нужно определить статус админа и залогиненности
-        bot_user_id, timestamp = get_session(user_id)
-        is_logged_in = bot_user_id is not None and (time.time() - timestamp) < SESSION_TIMEOUT
-        is_admin = (user_id == config.ADMIN_TELEGRAM_ID)
+        is_logged_in, is_admin = session.is_logged_in, session.is_admin
         main_text = "⬅️ *Главное меню*"
         if is_logged_in:
             main_text += "\n\n✅ Вы вошли в систему."
@@ -70,12 +70,13 @@ async def settings_button_handler(update: Update, context: ContextTypes.DEFAULT_
         message_id = context.user_data.get('main_menu_message_id') or query.message.message_id
 
         try:
-            await context.bot.edit_message_text(
+            await edit_coalescer.edit(
+                context.bot,
                 chat_id=chat_id,
                 message_id=message_id,
                 text=main_text,
                 parse_mode='Markdown',
-                reply_markup=get_main_menu(is_logged_in, is_admin)
+                reply_markup=get_main_menu(is_logged_in, is_admin, lang)
             )
         except Exception as e:
              logger.error(f"Ошибка редактирования сообщения для возврата в главное меню: {e}")
@@ -84,7 +85,7 @@ async def settings_button_handler(update: Update, context: ContextTypes.DEFAULT_
                  sent_message = await context.bot.send_message(
                      chat_id=chat_id,
                      text=main_text,
-                     reply_markup=get_main_menu(is_logged_in, is_admin),
+                     reply_markup=get_main_menu(is_logged_in, is_admin, lang),
                      parse_mode='Markdown'
                  )
                  context.user_data['main_menu_message_id'] = sent_message.message_id
@@ -0,0 +1,69 @@
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from src.config import config
+from src.locales import Langs, locales
+
+
+class KeyboardRegistry:
+    """
+    Реестр готовых клавиатур.
+    Каждый вариант меню собирается один раз для языка и дальше переиспользуется
+    (InlineKeyboardMarkup неизменяем, поэтому его можно отдавать всем обработчикам).
+    Меню настроек пересобирается, когда меняется SESSION_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._main: dict[tuple[Langs, bool, bool], InlineKeyboardMarkup] = {}
+        # Язык -> (SESSION_TIMEOUT, для которого собрано меню; меню)
+        self._settings: dict[Langs, tuple[int, InlineKeyboardMarkup]] = {}
+
+    def main_menu(self, is_logged_in: bool = False, is_admin: bool = False, lang: Langs | None = None) -> InlineKeyboardMarkup:
+        lang = lang or locales.get_default()
+        key = (lang, is_logged_in, is_admin)
+        markup = self._main.get(key)
+        if markup is None:
+            markup = self._main[key] = self._build_main_menu(is_logged_in, is_admin, lang)
+        return markup
+
+    def settings_menu(self, lang: Langs | None = None) -> InlineKeyboardMarkup:
+        lang = lang or locales.get_default()
+        cached = self._settings.get(lang)
+        if cached is None or cached[0] != config.SESSION_TIMEOUT:
+            cached = self._settings[lang] = (config.SESSION_TIMEOUT, self._build_settings_menu(lang))
+        return cached[1]
+
+    def invalidate(self):
+        """Сбрасывает все клавиатуры (например, после перезагрузки локализаций)."""
+        self._main.clear()
+        self._settings.clear()
+
+    @staticmethod
+    def _build_main_menu(is_logged_in: bool, is_admin: bool, lang: Langs) -> InlineKeyboardMarkup:
+        keyboard = []
+        if not is_logged_in:
+            keyboard.append([InlineKeyboardButton(locales.get("menu.login", lang), callback_data='login')])
+            keyboard.append([InlineKeyboardButton(locales.get("menu.register", lang), callback_data='register')])
+        else:
+            keyboard.append([InlineKeyboardButton(locales.get("menu.restart", lang), callback_data='restart')])
+            keyboard.append([InlineKeyboardButton(locales.get("menu.logout", lang), callback_data='logout')])
+
+        # Добавляем кнопку настроек только для администратора
+        if is_admin:
+            keyboard.append([InlineKeyboardButton(locales.get("menu.settings", lang), callback_data='settings')])
+
+        return InlineKeyboardMarkup(keyboard)
+
+    @staticmethod
+    def _build_settings_menu(lang: Langs) -> InlineKeyboardMarkup:
+        timeout_label = locales.get("settings_menu.timeout", lang).format(timeout=config.SESSION_TIMEOUT)
+        keyboard = [
+            [InlineKeyboardButton(timeout_label, callback_data='dummy_info')], # Информационная кнопка
+            [InlineKeyboardButton(locales.get("settings_menu.change_timeout", lang), callback_data='change_timeout')],
+            [InlineKeyboardButton(locales.get("settings_menu.back", lang), callback_data='back_to_main')],
+        ]
+        return InlineKeyboardMarkup(keyboard)
+
+
+keyboards = KeyboardRegistry()
+# Подписи кнопок берутся из локализаций — после их перезагрузки клавиатуры собираются заново
+locales.add_reload_listener(keyboards.invalidate)
@@ -0,0 +1,598 @@
+"""
+Система локализации с поддержкой вложенных ключей и placeholder'ов.
+
+Пример использования:
+    locales = Locales()
+
+    # Прямой доступ к языкам
+    text_ru = locales.RU.buttons.save  # "Сохранить"
+    text_en = locales.EN.buttons.save  # "Save"
+
+    # Получение строк через метод get
+    text_default = locales.get("buttons.save")  # "Сохранить" (RU по умолчанию)
+    text_explicit = locales.get("messages.welcome", Langs.EN)  # "Welcome!"
+
+    # Установка языка по умолчанию
+    locales.set_default(Langs.EN)
+    text_via_default = locales.buttons.save  # Доступ через язык по умолчанию (EN)
+    text_via_get_default = locales.get("buttons.save") # Также использует язык по умолчанию (EN)
+
+    # Обработка отсутствующих ключей
+    missing_key = locales.nonexistent.key  # Возвращает placeholder "<null>"
+    missing_key_str = str(locales.nonexistent.key) # Приведение к строке даст placeholder
+"""
+import asyncio
+import json
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, List, Union
+
+from src import config
+
+# Предполагается, что logger определен в src.logger
+# from src.logger import logger
+# Для демонстрации используем стандартный логгер
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)  # Простая настройка для примера
+default_logger = logging.getLogger()
+
+
+class Langs(Enum):
+    """Поддерживаемые языки"""
+    RU = "ru"
+    EN = "en"
+
+
+class LocalizedObject:
+    """
+    Динамический объект для хранения локализованных данных.
+    Позволяет обращаться к ключам как к атрибутам: obj.key.subkey
+    Также поддерживает списки: obj.list_attr[index]
+    Вложенные объекты создаются лениво при первом обращении и кешируются,
+    а все отсутствующие ключи возвращают общую неизменяемую пустышку.
+    """
+    # __dict__ выделяется только при первом обращении к ключу и служит кешем:
+    # повторный доступ к ключу — обычный поиск атрибута без вызова __getattr__
+    __slots__ = ("_data", "_children", "_placeholder", "_log_missing_attrs", "_is_missing_stub", "_is_list",
+                 "_scalar_value", "__dict__")
+
+    # Общие пустышки: (placeholder, log_missing_attrs) -> LocalizedObject
+    _stubs: Dict[tuple, 'LocalizedObject'] = {}
+
+    def __init__(self, data: Optional[Union[Dict[str, Any], List[Any]]] = None, placeholder: str = "<null>",
+                 log_missing_attrs: bool = False):
+        """
+        Инициализирует объект с данными. Дочерние объекты не создаются до первого обращения.
+        Args:
+            data: Словарь, список или скалярное значение.
+            placeholder: Значение для отсутствующих ключей/индексов.
+            log_missing_attrs: Логировать ли обращения к отсутствующим атрибутам/индексам.
+        """
+        self._placeholder = placeholder
+        self._log_missing_attrs = log_missing_attrs
+        # Флаг, указывающий, является ли этот объект "пустышкой" для отсутствующих ключей
+        self._is_missing_stub = False
+        # Флаг, указывающий, представляет ли этот объект список
+        self._is_list = isinstance(data, list)
+        # Исходные данные (dict или list); дочерние LocalizedObject кешируются в _children
+        self._data: Union[Dict[str, Any], List[Any]] = data if isinstance(data, (dict, list)) else {}
+        self._children: Optional[Dict[int, 'LocalizedObject']] = None  # Кеш элементов списка
+        # Если data - скаляр (строка, число и т.д.), сохраняем его отдельно
+        # Это маловероятный сценарий при нормальной инициализации, но обработаем для полноты
+        self._scalar_value = data if data is not None and not isinstance(data, (dict, list)) else None
+
+    @classmethod
+    def _create_missing_stub(cls, placeholder: str = "<null>", log_missing_attrs: bool = False):
+        """Возвращает общую 'пустышку' для заданных настроек (создаётся один раз)."""
+        key = (placeholder, log_missing_attrs)
+        stub = cls._stubs.get(key)
+        if stub is None:
+            stub = cls(placeholder=placeholder, log_missing_attrs=log_missing_attrs)
+            stub._is_missing_stub = True
+            cls._stubs[key] = stub
+        return stub
+
+    def _missing(self) -> 'LocalizedObject':
+        return LocalizedObject._create_missing_stub(self._placeholder, self._log_missing_attrs)
+
+    def _wrap(self, key: int, value: Any) -> Any:
+        """Оборачивает вложенные dict/list элемента списка в LocalizedObject при первом обращении."""
+        if not isinstance(value, (dict, list)):
+            return value
+        if self._children is None:
+            self._children = {}
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = LocalizedObject(value, self._placeholder, self._log_missing_attrs)
+        return child
+
+    def __getattr__(self, name: str) -> Union['LocalizedObject', str]:
+        """
+        Возвращает значение ключа, вложенный объект или 'пустышку' для несуществующих атрибутов.
+        Args:
+            name: Имя атрибута.
+        Returns:
+            Значение атрибута, вложенный LocalizedObject или пустышка.
+        """
+        # Служебные атрибуты не найдены (например, при копировании объекта) — не ищем их в данных
+        if name in _SERVICE_ATTRS or name.startswith('__'):
+            raise AttributeError(name)
+        # Если это "пустышка", то и все её атрибуты тоже "пустышки"
+        if self._is_missing_stub:
+            # Возвращаем "пустышку", которая также может обрабатывать индексы []
+            return self
+        # Для обычного объекта (не пустышки) проверяем, не является ли он списком
+        if self._is_list:
+            # Если объект представляет собой список, доступ к атрибутам не имеет смысла
+            # Но для совместимости с цепочками вроде obj.missing_list.attr, возвращаем пустышку
+            if self._log_missing_attrs:
+                logger.warning(f"Попытка доступа к атрибуту '{name}' у объекта-списка. Возвращается пустышка.")
+            return self._missing()
+
+        if name in self._data:
+            value = self._data[name]
+            if isinstance(value, (dict, list)):
+                value = LocalizedObject(value, self._placeholder, self._log_missing_attrs)
+            # Кешируем в __dict__: следующие обращения не дойдут до __getattr__
+            self.__dict__[name] = value
+            return value
+
+        # Для обычного словареподобного объекта логируем ошибку, если нужно, и возвращаем "пустышку"
+        if self._log_missing_attrs:
+            logger.error(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        # Возвращаем "пустышку", чтобы можно было продолжать цепочку вызовов
+        return self._missing()
+
+    def __getitem__(self, index: Union[int, str]) -> Union['LocalizedObject', str]:
+        """
+        Позволяет обращаться к элементам, если объект представляет собой список.
+        Также используется пустышками для поддержки цепочек obj.missing[0].
+        Args:
+            index: Индекс (int) или ключ (str) для доступа.
+        Returns:
+            Элемент списка/значение или пустышка.
+        """
+        # Если это "пустышка", то и все её элементы тоже "пустышки"
+        if self._is_missing_stub:
+            return self
+
+        if self._is_list:
+            # Проверяем тип индекса
+            if isinstance(index, int):
+                try:
+                    # Доступ по числовому индексу; dict/list элементы оборачиваются при первом обращении
+                    item = self._data[index]
+                except IndexError:
+                    if self._log_missing_attrs:
+                        logger.warning(f"Индекс {index} выходит за пределы списка (длина {len(self._data)})")
+                    return self._missing()
+                # Отрицательный индекс кешируем под положительным, чтобы не создавать дубликаты
+                return self._wrap(index % len(self._data), item)
+            elif isinstance(index, str):
+                # Доступ по строковому ключу к списку (например, obj.list["key"])
+                # Это нестандартно для списков, но для гибкости можно вернуть пустышку
+                if self._log_missing_attrs:
+                    logger.warning(f"Попытка строкового доступа ['{index}'] к списку. Возвращается пустышка.")
+                return self._missing()
+            else:
+                # Не int и не str
+                if self._log_missing_attrs:
+                    logger.warning(f"Неподдерживаемый тип индекса {type(index)} для списка. Возвращается пустышка.")
+                return self._missing()
+        else:
+            # Попытка индексации не по списку
+            if self._log_missing_attrs:
+                logger.warning(f"Попытка индексации ['{index}'] у объекта, который не является списком.")
+            return self._missing()
+
+    def __len__(self) -> int:
+        """Возвращает длину списка, если объект представляет собой список."""
+        if self._is_missing_stub:
+            # Длина пустышки-списка - 0
+            return 0
+        if self._is_list:
+            return len(self._data)
+        # Для не-списков длина не определена, но __len__ должен возвращать int
+        return 0
+
+    def __iter__(self):
+        """Позволяет итерироваться по списку, если объект представляет собой список."""
+        if self._is_missing_stub or not self._is_list:
+            # Итерация по пустышке или не-списку — пустой итератор
+            return iter([])
+        return (self._wrap(i, item) for i, item in enumerate(self._data))
+
+    def __str__(self) -> str:
+        """Если объект является 'пустышкой', возвращаем placeholder при приведении к строке.
+           Если объект представляет собой список, возвращаем его строковое представление.
+        """
+        if self._is_missing_stub:
+            return self._placeholder
+        if self._is_list:
+            # Элементы, которые являются LocalizedObject (из dict), будут отображаться как объекты
+            return str(list(self))
+        # Если это не "пустышка" и не список, поведение по умолчанию
+        return super().__str__()
+
+    def __repr__(self) -> str:
+        if self._is_missing_stub:
+            return f"LocalizedObject(_placeholder='{self._placeholder}', _is_missing_stub=True)"
+        if self._is_list:
+            return f"LocalizedObject(list, len={len(self._data)})"
+        return super().__repr__()
+
+    def __dir__(self) -> List[str]:
+        """Возвращает список доступных атрибутов."""
+        if self._is_list:
+            # Для списка нет атрибутов в обычном смысле, но можно добавить методы
+            return ['__getitem__', '__len__', '__iter__']
+        return list(self._data.keys())
+
+
+_SERVICE_ATTRS = frozenset(LocalizedObject.__slots__)
+
+
+class Locales:
+    """
+    Система управления локализациями.
+    Загружает JSON-файлы из директории локализаций и предоставляет
+    удобный доступ к строкам на разных языках.
+    """
+    # Атрибуты для автокомплита (динамически создаются)
+    RU: LocalizedObject
+    EN: LocalizedObject
+
+    def __init__(self, locale_folder: str = "./locales", placeholder: str = "<null>", log_missing: bool = True,
+                 _debug: bool = False, _logger: Optional[logging.Logger] = None):
+        """
+        Инициализирует систему локализаций.
+        Args:
+            locale_folder: Путь к директории с JSON-файлами локализаций.
+            placeholder: Значение для отсутствующих ключей.
+            log_missing: Логировать ли отсутствующие ключи.
+            _debug: Включить режим отладки (дополнительные логи).
+            _logger: Кастомный логгер.
+        """
+        # Инициализируем базовые атрибуты
+        self.RU = LocalizedObject()
+        self.EN = LocalizedObject()
+        self.debug = _debug
+        self.logger = _logger if _logger is not None else default_logger
+
+        # Настройки
+        self._lf: Path = Path(locale_folder)
+        self._placeholder: str = placeholder
+        self._log_missing: bool = log_missing
+
+        # Данные
+        self._locales_data: Dict[str, Dict[str, Any]] = {}
+        self._lang_cache: Dict[str, LocalizedObject] = {}
+        # Плоский индекс: код языка -> {"полный.ключ": строка}, строится при загрузке
+        self._flat: Dict[str, Dict[str, str]] = {}
+        # Код языка -> (mtime_ns, размер) файла на момент последней загрузки
+        self._mtimes: Dict[str, Optional[tuple]] = {}
+        # Вызываются после каждой перезагрузки (например, сброс кеша клавиатур)
+        self._reload_listeners: List[Callable[[], None]] = []
+
+        # Язык по умолчанию
+        self._default_lang: Langs = Langs.RU  # Устанавливаем RU как язык по умолчанию по умолчанию
+
+        # Загружаем локализации
+        self.reload()
+
+    def _load_locales(self) -> Dict[str, Dict[str, Any]]:
+        """Загружает данные локализации из JSON-файлов и запоминает их mtime."""
+        locales_data: Dict[str, Dict[str, Any]] = {}
+        if not (self._lf.exists() and self._lf.is_dir()):
+            self.logger.warning(f"Директория локализаций не найдена: {self._lf}")
+            return locales_data
+        for lang in Langs:
+            file_path = self._lf / f"{lang.value}.json"
+            self._mtimes[lang.value] = self._file_signature(file_path)
+            data = self._read_file(file_path)
+            if data is not None:
+                locales_data[lang.value] = data
+        return locales_data
+
+    @staticmethod
+    def _file_signature(file_path: Path) -> Optional[tuple]:
+        """Признак изменения файла: (mtime в наносекундах, размер) или None, если файла нет."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Читает один JSON-файл локализации. Возвращает None, если файл пуст или повреждён."""
+        if not file_path.exists() or file_path.stat().st_size == 0:
+            return None
+        try:
+            with open(file_path, 'r', encoding='utf-8') as _f:
+                data = json.load(_f)
+                if data is None:
+                    self.logger.warning(f"Файл {file_path} содержит пустой JSON")
+                return data
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Ошибка парсинга JSON в файле {file_path}: {e}")
+        except IOError as e:
+            self.logger.error(f"Ошибка чтения файла {file_path}: {e}")
+        return None
+
+    @staticmethod
+    def _flatten(data: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Разворачивает вложенный словарь в {"ключ.подключ": строка}. Словари — не конечные значения."""
+        if out is None:
+            out = {}
+        for key, value in data.items():
+            full_key = f"{prefix}{key}"
+            if isinstance(value, dict):
+                Locales._flatten(value, f"{full_key}.", out)
+            else:
+                out[full_key] = str(value)
+        return out
+
+    def __getattr__(self, name: str) -> Union[LocalizedObject, str]:
+        """
+        Позволяет обращаться к языкам и ключам через язык по умолчанию.
+        Args:
+            name: Имя атрибута (код языка или ключ).
+        Returns:
+            LocalizedObject для поддерживаемых языков или объект языка по умолчанию для ключей.
+        Raises:
+            AttributeError: Если атрибут не поддерживается и не является ключом.
+        """
+        # Если запрашиваемый атрибут - это поддерживаемый язык, возвращаем его объект
+        if name in [lang.value.upper() for lang in Langs]:
+            # Если язык еще не загружен, возвращаем пустой объект
+            if not hasattr(self, name) or not isinstance(getattr(self, name), LocalizedObject):
+                return LocalizedObject(placeholder=self._placeholder, log_missing_attrs=self._log_missing)
+            return getattr(self, name)
+
+        # Если это не код языка, пробуем найти ключ в языке по умолчанию
+        try:
+            default_lang_obj = getattr(self, self._default_lang.value.upper())
+            if isinstance(default_lang_obj, LocalizedObject):
+                return getattr(default_lang_obj, name)
+        except AttributeError:
+            pass  # Будет вызван основной AttributeError ниже
+
+        # Если и ключ в языке по умолчанию не найден, вызываем исключение
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+    def __dir__(self) -> List[str]:
+        """Помогает IDE видеть доступные атрибуты."""
+        attrs = list(self.__dict__.keys())
+        attrs.extend([lang.value.upper() for lang in Langs])
+        # Также добавляем ключи из языка по умолчанию для лучшей видимости в IDE (приблизительно)
+        try:
+            default_lang_obj = getattr(self, self._default_lang.value.upper())
+            if isinstance(default_lang_obj, LocalizedObject):
+                attrs.extend(dir(default_lang_obj))
+        except AttributeError:
+            pass
+        return attrs
+
+    def get(self, key: str, lang: Optional[Langs] = None, default: Optional[str] = None) -> str:
+        """
+        Получает значение по ключу для указанного (или по умолчанию) языка.
+        Поддерживает вложенные ключи через точку: "buttons.save"
+        Args:
+            key: Ключ в формате "key.subkey.subsubkey".
+            lang: Язык (по умолчанию используется язык по умолчанию экземпляра).
+            default: Значение по умолчанию.
+        Returns:
+            Строка с переводом или placeholder/default.
+        Examples:
+            locales.get("buttons.save")
+            locales.get("messages.welcome", Langs.EN)
+            locales.get("nonexistent.key", default="Default text")
+        """
+        # Используем язык по умолчанию, если язык не указан
+        target_lang = lang if lang is not None else self._default_lang
+        # Быстрый путь: один поиск в плоском индексе
+        value = self._flat.get(target_lang.value, {}).get(key)
+        if value is not None:
+            return value
+        return self._get_missing(key, target_lang, default)
+
+    def _get_missing(self, key: str, target_lang: Langs, default: Optional[str]) -> str:
+        """Медленный путь для отсутствующих ключей: выясняет причину, логирует и возвращает placeholder/default."""
+        try:
+            # Получаем данные для языка
+            data = self._locales_data.get(target_lang.value, {})
+            if not data:
+                if self._log_missing:
+                    self.logger.warning(f"Язык {target_lang.value} не загружен")
+                return default or self._placeholder
+            # Разбираем вложенный ключ
+            keys = key.split('.')
+            current_data = data
+            # Проходим по всем ключам кроме последнего
+            for k in keys[:-1]:
+                if not isinstance(current_data, dict) or k not in current_data:
+                    if self._log_missing:
+                        self.logger.warning(
+                            f"Ключ '{'.'.join(keys[:keys.index(k) + 1])}' не найден в {target_lang.value}"
+                        )
+                    return default or self._placeholder
+                current_data = current_data[k]
+            # Получаем последнее значение
+            final_key = keys[-1]
+            if not isinstance(current_data, dict) or final_key not in current_data:
+                if self._log_missing:
+                    self.logger.warning(f"Ключ '{key}' не найден в {target_lang.value}")
+                return default or self._placeholder
+            result = current_data[final_key]
+            # Если результат - словарь, это неполный путь
+            if isinstance(result, dict):
+                if self._log_missing:
+                    self.logger.warning(f"Неполный путь к ключу '{key}' в {target_lang.value}")
+                return default or self._placeholder
+            return str(result)
+        except Exception as e:
+            if self._log_missing:
+                self.logger.error(f"Ошибка получения ключа '{key}' для языка {target_lang.value}: {e}")
+            return default or self._placeholder
+
+    def get_raw(self, key: str, lang: Optional[Langs] = None, _default: Optional[str] = None) -> Optional[str]:
+        """
+        Получает значение по ключу без placeholder'а.
+        Args:
+            key: Ключ в формате "key.subkey".
+            lang: Язык (по умолчанию используется язык по умолчанию экземпляра).
+            _default: Значение по умолчанию.
+        Returns:
+            Строка с переводом, default или None.
+        """
+        # Используем язык по умолчанию, если язык не указан
+        target_lang = lang if lang is not None else self._default_lang
+        result = self.get(key, target_lang, _default)
+        return result if result != self._placeholder else _default
+
+    def reload(self) -> None:
+        """Перезагружает все локализации."""
+        # Загружаем в новые таблицы и подменяем целиком: читатели видят либо старое, либо новое состояние
+        self._mtimes = {}
+        self._swap(self._load_locales())
+        if self.debug:
+            self.logger.info("Локализации перезагружены")
+
+    def reload_changed(self) -> List[str]:
+        """
+        Перечитывает только изменившиеся файлы локализаций (по mtime и размеру).
+        Если файл удалён или не разбирается, остаётся прежняя версия языка.
+        Returns:
+            Список кодов перезагруженных языков.
+        """
+        changed: Dict[str, Dict[str, Any]] = {}
+        for lang in Langs:
+            file_path = self._lf / f"{lang.value}.json"
+            signature = self._file_signature(file_path)
+            if signature == self._mtimes.get(lang.value):
+                continue
+            # Запоминаем сразу, чтобы битый файл не перечитывался и не логировался на каждой проверке
+            self._mtimes[lang.value] = signature
+            data = self._read_file(file_path) if signature is not None else None
+            if data is None:
+                self.logger.warning(f"Файл {file_path} изменён, но не загружен — оставлена прежняя версия")
+                continue
+            changed[lang.value] = data
+        if changed:
+            self._swap({**self._locales_data, **changed})
+            self.logger.info(f"Локализации перезагружены: {', '.join(changed)}")
+        return list(changed)
+
+    def _swap(self, locales_data: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Строит индексы и объекты языков для новых данных и подменяет их присваиванием ссылок.
+        Неизменившиеся языки берутся из текущего индекса без повторной компиляции.
+        """
+        old_data, old_flat = self._locales_data, self._flat
+        flat: Dict[str, Dict[str, str]] = {}
+        lang_cache: Dict[str, LocalizedObject] = {}
+        for lang_code, lang_data in locales_data.items():
+            if not isinstance(lang_data, dict):
+                continue
+            unchanged = old_data.get(lang_code) is lang_data and lang_code in old_flat
+            flat[lang_code] = old_flat[lang_code] if unchanged else self._flatten(lang_data)
+            lang_obj = self._lang_cache.get(lang_code) if unchanged else None
+            if lang_obj is None:
+                lang_obj = LocalizedObject(lang_data, self._placeholder, self._log_missing)
+            lang_cache[lang_code] = lang_obj
+
+        self._locales_data = locales_data
+        self._flat = flat
+        self._lang_cache = lang_cache
+        for lang in Langs:
+            lang_obj = lang_cache.get(lang.value)
+            if lang_obj is None:
+                lang_obj = LocalizedObject(placeholder=self._placeholder, log_missing_attrs=self._log_missing)
+            setattr(self, lang.value.upper(), lang_obj)
+
+        for listener in self._reload_listeners:
+            try:
+                listener()
+            except Exception as e:
+                self.logger.error(f"Ошибка обработчика перезагрузки локализаций: {e}")
+
+    def add_reload_listener(self, listener: Callable[[], None]) -> None:
+        """Регистрирует функцию, вызываемую после перезагрузки локализаций."""
+        self._reload_listeners.append(listener)
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """Фоновая задача: периодически проверяет файлы локализаций и перезагружает изменённые."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reload_changed()
+            except Exception as e:
+                self.logger.error(f"Ошибка проверки файлов локализаций: {e}")
+
+    def available_languages(self) -> List[str]:
+        """
+        Возвращает список доступных языков.
+        Returns:
+            Список кодов доступных языков.
+        """
+        return list(self._locales_data.keys())
+
+    def has_language(self, lang: Langs) -> bool:
+        """
+        Проверяет, загружен ли указанный язык.
+        Args:
+            lang: Язык для проверки.
+        Returns:
+            True если язык загружен, иначе False.
+        """
+        return lang.value in self._locales_data
+
+    def set_placeholder(self, placeholder: str) -> None:
+        """
+        Устанавливает новый placeholder.
+        Args:
+            placeholder: Новое значение placeholder'а.
+        """
+        self._placeholder = placeholder
+
+    def set_log_missing(self, log_missing: bool) -> None:
+        """
+        Включает/выключает логирование отсутствующих ключей.
+        Args:
+            log_missing: True для включения логирования.
+        """
+        self._log_missing = log_missing
+
+    def set_default(self, lang: Langs) -> None:
+        """
+        Устанавливает язык по умолчанию для этого экземпляра.
+        Args:
+            lang: Язык по умолчанию (из перечисления Langs).
+        Raises:
+            ValueError: Если указанный язык не поддерживается.
+        """
+        if not isinstance(lang, Langs):
+            raise ValueError("Язык должен быть элементом перечисления Langs")
+        # Проверка на наличие языка в загруженных данных может быть опциональной
+        # if not self.has_language(lang):
+        #     self.logger.warning(f"Язык {lang.value} не загружен, но установлен как язык по умолчанию.")
+        self._default_lang = lang
+        if self.debug:
+            self.logger.info(f"Язык по умолчанию установлен на {lang.value}")
+
+    def get_default(self) -> Langs:
+        """
+        Возвращает текущий язык по умолчанию.
+        Returns:
+            Текущий язык по умолчанию (элемент перечисления Langs).
+        """
+        return self._default_lang
+
+
+# Общий экземпляр: JSON-файлы лежат рядом с модулем
+locales = Locales(str(Path(__file__).parent))
+try:
+    locales.set_default(Langs(config.config.PREFER_LANG))
+except ValueError:
+    logger.warning(f"Неизвестный PREFER_LANG '{config.config.PREFER_LANG}', используется {locales.get_default().value}")
@@ -1,5 +1,8 @@
-import logging
+import atexit
 import inspect
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 
 class DetailedFormatter(logging.Formatter):
@@ -31,15 +34,67 @@ class DetailedFormatter(logging.Formatter):
         return super().format(record)
 
 
+class FastFormatter(logging.Formatter):
+    """
+    Быстрый форматтер без обхода стека.
+    Префикс класса передаётся из места вызова: logger.info(..., extra={'classPrefix': 'Class.'}),
+    иначе выводится только funcName.
+    """
+    def format(self, record):
+        if not hasattr(record, 'classPrefix'):
+            record.classPrefix = ''
+        return super().format(record)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler без форматирования и копирования записи в потоке вызова."""
+    def prepare(self, record):
+        # Собираем только текст сообщения (аргументы могут измениться позже), остальное — в потоке вывода
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s::%(name)s - %(filename)s:%(lineno)d - %(classPrefix)s%(funcName)s - %(message)s'
+
 # Настройка логгера
 logger = logging.getLogger()
 handler = logging.StreamHandler()
-formatter = DetailedFormatter(
-    '%(asctime)s - %(levelname)s::%(name)s - %(filename)s:%(lineno)d - %(classPrefix)s%(funcName)s - %(message)s')
+formatter = DetailedFormatter(LOG_FORMAT)
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+_listener: QueueListener | None = None
+
+
+def setup_logging(mode: str = 'detailed'):
+    """
+    Настраивает вывод корневого логгера.
+    'detailed' — DetailedFormatter в вызывающем потоке (как раньше);
+    'fast' — FastFormatter, а форматирование и вывод вынесены из потока
+    цикла событий в отдельный поток через QueueHandler/QueueListener.
+    """
+    global _listener
+    if mode != 'fast' or _listener is not None:
+        return
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(FastFormatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    logger.removeHandler(handler)
+    logger.addHandler(_DeferredQueueHandler(log_queue))
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Дописывает очередь логов и останавливает поток вывода."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 dbActiveSessionsLogger = logging.getLogger("DB_ACTIVE_SESSIONS")
 dbUsersLogger = logging.getLogger("DB_USERS")
 dbAnyLogger = logging.getLogger("DB")
@@ -0,0 +1,261 @@
+"""
+Метрики бота в текстовом формате Prometheus.
+Счётчики и гистограммы обновляются из любых потоков (БД и SSH работают в своих
+пулах), гейджи считаются функциями в момент запроса. Страница отдаётся
+встроенным HTTP-сервером на METRICS_PORT — внешний сервис не нужен.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from src.logger import logger
+from src.tracing import span
+
+LabelValues = tuple[str, ...]
+
+# Границы корзин гистограмм по умолчанию, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                                 for labels, value in items]
+
+
+class Histogram(_Metric):
+    """Распределение длительностей по корзинам (с суммой и количеством)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Метки -> [счётчики корзин..., +Inf, сумма]
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Замеряет длительность блока."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(labels, list(row)) for labels, row in self._values.items()]
+        lines = self._header()
+        for labels, row in items:
+            cumulative = 0.0
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, row):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + bound + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            plain_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain_labels} {row[-1]}")
+            lines.append(f"{self.name}_count{plain_labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Текущее значение, вычисляемое функцией: число или {метки: число}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float | dict[LabelValues, float]],
+                 labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.warning(f"Не удалось вычислить метрику {self.name}: {e}")
+            return []
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {float(v)}"
+                                 for labels, v in items]
+
+
+class ExecutorLoad:
+    """
+    Задания пула потоков, отправленные и ещё не завершённые (в очереди и выполняющиеся).
+    Считаются при отправке и по завершении, без обращения к внутренностям ThreadPoolExecutor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.finished = 0
+
+    def submit(self, executor: concurrent.futures.Executor, fn: Callable, *args) -> concurrent.futures.Future:
+        future = executor.submit(fn, *args)
+        with self._lock:
+            self.submitted += 1
+        # Колбэк вызывается в потоке пула (или сразу, если задание уже завершено)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _future: concurrent.futures.Future):
+        with self._lock:
+            self.finished += 1
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self.submitted - self.finished
+
+
+class MetricsRegistry:
+    """Набор метрик бота. Повторная регистрация с тем же именем возвращает существующую метрику."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float | dict[LabelValues, float]],
+              labelnames: tuple[str, ...] = ()) -> Gauge:
+        gauge = Gauge(name, documentation, callback, labelnames)
+        with self._lock:
+            self._metrics[name] = gauge  # Новая функция заменяет старую
+        return gauge
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+HANDLER_REQUESTS = metrics.counter(
+    "bot_handler_requests_total", "Обработанные команды и нажатия кнопок", ("handler", "status"))
+HANDLER_DURATION = metrics.histogram(
+    "bot_handler_duration_seconds", "Длительность обработчиков команд и кнопок", ("handler",))
+# Общая для модулей, которые вызывают Bot API напрямую (engine, edit_coalescer)
+TELEGRAM_API_SECONDS = metrics.histogram(
+    "bot_telegram_api_seconds", "Вызовы Bot API (без ожидания склейки и лимитов)", ("method",))
+
+
+def track_handler(callback):
+    """Оборачивает обработчик PTB: число вызовов (ok/error), длительность и спан трассы."""
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            with span("handler." + name):
+                return await callback(update, context)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            HANDLER_DURATION.observe(time.perf_counter() - started, name)
+            HANDLER_REQUESTS.inc(name, status)
+
+    return wrapper
+
+
+async def _handle_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5)
+        # Заголовки запроса не нужны, но их надо дочитать
+        while await asyncio.wait_for(reader.readline(), 5) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/metrics", "/"):
+            status, body = "200 OK", metrics.render().encode()
+        else:
+            status, body = "404 Not Found", b"not found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """Запускает HTTP-сервер метрик (GET /metrics) в текущем цикле событий."""
+    server = await asyncio.start_server(_handle_http, host, port)
+    logger.info(f"Метрики доступны на http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,257 @@
+"""
+Очередь перезапусков сессий.
+/restart ставит задачу в таблицу restart_jobs вместо выполнения SSH прямо в
+обработчике: задача переживает остановку бота, а запросы к пользователю на
+сервере, для которого задача уже есть, присоединяются к ней. Задачи выполняет
+ограниченный пул воркеров; ошибки SSH повторяются с экспоненциальной задержкой,
+а о результате все ожидающие узнают через основное сообщение.
+"""
+import asyncio
+import time
+
+from telegram.ext import Application
+
+from src.config import config
+from src.db.async_utils import (
+    claim_restart_job,
+    enqueue_restart_job,
+    finish_restart_job,
+    get_next_restart_run,
+    get_session,
+    recover_restart_jobs,
+    retry_restart_job,
+)
+from src.edit_coalescer import edit_coalescer
+from src.engine import update_user_main_message
+from src.logger import logger
+from src.metrics import metrics
+from src.ssh import logoff_user_session, restart_error_text
+from src.update_processor import PerUserUpdateProcessor
+
+RESTART_JOBS = metrics.counter(
+    "bot_restart_jobs_total", "Задачи очереди перезапусков по исходу (queued, joined, retry, done, failed)",
+    ("outcome",))
+
+# Наибольшее ожидание воркера без задач: страховка, если пробуждение потерялось
+_IDLE_WAIT = 60.0
+
+
+class RestartJobQueue:
+    """Пул воркеров, выполняющих задачи из таблицы restart_jobs."""
+
+    def __init__(self, workers: int = 4, max_attempts: int = 3, retry_delay: float = 2.0,
+                 max_retry_delay: float = 60.0, retention: float = 86400.0):
+        self.workers = workers
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.retention = retention
+        self.running = 0  # Задачи, выполняющиеся сейчас
+
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        # Итоги попыток, которые не удалось записать в БД: job_id -> (статус, результат, время повтора)
+        self._unsaved: dict[int, tuple[str, str, float | None]] = {}
+        # Ожидающие результата в этом процессе (массовый перезапуск): (job_id, telegram_id) -> futures
+        self._waiters: dict[tuple[int, int], list[asyncio.Future]] = {}
+        # Уведомления пользователей выполняются отдельными задачами: они ждут очереди пользователя
+        self._notifications: set[asyncio.Task] = set()
+        self._application: Application | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    async def start(self, application: Application):
+        """Возвращает в очередь прерванные задачи и запускает воркеры."""
+        self._application = application
+        await recover_restart_jobs(self.retention)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Очередь перезапусков: {self.workers} воркеров, до {self.max_attempts} попыток")
+
+    async def stop(self):
+        """
+        Останавливает воркеры. Задачи, прерванные посреди SSH, остаются в статусе
+        'running' и выполняются заново при следующем запуске.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Результаты уже в БД; недоставленные уведомления ждём недолго
+        if self._notifications:
+            _, pending = await asyncio.wait(self._notifications, timeout=5)
+            for task in pending:
+                task.cancel()
+
+    async def submit(self, target: str, telegram_id: int, chat_id: int, status_message_id: int | None = None) -> bool:
+        """
+        Ставит перезапуск сессии target в очередь; пользователь получит результат в чат chat_id.
+        Возвращает False, если для target уже есть незавершённая задача и запрос присоединился к ней.
+        """
+        _, created = await self._enqueue(target, telegram_id, chat_id, status_message_id)
+        return created
+
+    async def run(self, target: str, telegram_id: int, chat_id: int) -> str:
+        """
+        Ставит перезапуск сессии target в очередь и ждёт его результата (массовый перезапуск
+        собирает результаты в одно сообщение). Пока результат ждут здесь, основное сообщение
+        пользователя по этой задаче не обновляется; если бот остановится раньше, задача
+        выполнится после запуска и результат придёт обычным уведомлением.
+        """
+        job_id, _ = await self._enqueue(target, telegram_id, chat_id, None)
+        # Регистрируем ожидание до переключения задач: итог задачи запишется не раньше
+        key = (job_id, telegram_id)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        try:
+            return await future
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def _enqueue(self, target: str, telegram_id: int, chat_id: int,
+                       status_message_id: int | None) -> tuple[int, bool]:
+        job_id, created = await enqueue_restart_job(target.lower(), telegram_id, chat_id, status_message_id)
+        RESTART_JOBS.inc("queued" if created else "joined")
+        if created:
+            logger.info(f"Перезапуск {target} поставлен в очередь (задача {job_id}) пользователем {telegram_id}")
+        else:
+            logger.info(f"Пользователь {telegram_id} присоединился к перезапуску {target} (задача {job_id})")
+        self._wakeup.set()
+        return job_id, created
+
+    async def _worker(self):
+        while True:
+            # Сброс до запроса: задача, поставленная после него, разбудит воркер снова
+            self._wakeup.clear()
+            try:
+                await self._save_pending()
+                job = await claim_restart_job()
+                if job is None:
+                    await self._wait_for_job()
+                else:
+                    await self._run(*job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка воркера очереди перезапусков: {e}")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _wait_for_job(self):
+        """Ждёт новую задачу или срок ближайшей повторной попытки."""
+        next_run = await get_next_restart_run()
+        timeout = _IDLE_WAIT if next_run is None else min(_IDLE_WAIT, max(0.0, next_run - time.time()))
+        if self._unsaved:
+            timeout = min(timeout, self.retry_delay)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, job_id: int, target: str, attempt: int):
+        self.running += 1
+        try:
+            result = await logoff_user_session(target)
+            status, next_run = 'done', None
+        except Exception as e:
+            if attempt < self.max_attempts:
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (attempt - 1))
+                logger.warning(f"Перезапуск {target} (задача {job_id}, попытка {attempt}) не удался: {e!r}; "
+                               f"повтор через {delay:.0f} с")
+                result, status, next_run = str(e), 'retry', time.time() + delay
+            else:
+                result, status, next_run = restart_error_text(target, e), 'failed', None
+        finally:
+            self.running -= 1
+        self._unsaved[job_id] = (status, result, next_run)
+        await self._save(job_id)
+
+    async def _save_pending(self):
+        """Повторяет запись итогов, которые не удалось сохранить раньше."""
+        for job_id in list(self._unsaved):
+            if not await self._save(job_id):
+                break
+
+    async def _save(self, job_id: int) -> bool:
+        """
+        Записывает итог попытки и уведомляет пользователей. Если БД недоступна, итог остаётся
+        в памяти и записывается воркером позже: задача не зависает в статусе 'running'
+        (и не блокирует новые перезапуски того же пользователя), а успешный logoff не повторяется.
+        """
+        outcome = self._unsaved.pop(job_id, None)
+        if outcome is None:
+            return True  # Итог уже записывает другой воркер
+        status, result, next_run = outcome
+        try:
+            if status == 'retry':
+                await retry_restart_job(job_id, next_run, result)
+                watchers = []
+            else:
+                watchers = await finish_restart_job(job_id, status, result)
+        except Exception as e:
+            logger.error(f"Не удалось сохранить итог задачи перезапуска {job_id} ({status}): {e}; повтор позже")
+            self._unsaved[job_id] = outcome
+            return False
+        RESTART_JOBS.inc(status)
+        # Пользователь мог присоединиться к задаче несколько раз: правим каждое его сообщение статуса,
+        # а основное сообщение — один раз
+        users: dict[int, tuple[int, list[int]]] = {}
+        for telegram_id, chat_id, status_message_id in watchers:
+            status_messages = users.setdefault(telegram_id, (chat_id, []))[1]
+            if status_message_id:
+                status_messages.append(status_message_id)
+        for telegram_id, (chat_id, status_messages) in users.items():
+            waiters = self._waiters.pop((job_id, telegram_id), [])
+            for future in waiters:
+                if not future.done():
+                    future.set_result(result)
+            # Воркер не ждёт уведомления: очередь пользователя может держать обработчик,
+            # который сам ждёт задачи из этой очереди (массовый перезапуск)
+            task = asyncio.create_task(self._notify(telegram_id, chat_id, status_messages, result,
+                                                    update_main=not waiters))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+        return True
+
+    async def _notify(self, telegram_id: int, chat_id: int, status_message_ids: list[int], result: str,
+                      update_main: bool = True):
+        """Показывает результат в сообщениях статуса и (если update_main) в основном сообщении пользователя."""
+        bot = self._application.bot
+        for status_message_id in status_message_ids:
+            try:
+                await edit_coalescer.edit(bot, chat_id=chat_id, message_id=status_message_id, text=result)
+            except Exception as e:
+                logger.error(f"Ошибка редактирования временного сообщения статуса: {e}")
+        if not update_main:
+            return
+        try:
+            update = self._update_main_message(telegram_id, chat_id, result)
+            processor = self._application.update_processor
+            if isinstance(processor, PerUserUpdateProcessor):
+                # user_data и основное сообщение меняются в очереди пользователя, не наперегонки с его обработчиками
+                await processor.run_for_user(telegram_id, update)
+            else:
+                await update
+        except Exception as e:
+            logger.error(f"Не удалось уведомить пользователя {telegram_id} о перезапуске: {e}")
+
+    async def _update_main_message(self, telegram_id: int, chat_id: int, result: str):
+        bot_user_id, timestamp = await get_session(telegram_id)
+        is_logged_in = bot_user_id is not None and (time.time() - timestamp) < config.SESSION_TIMEOUT
+        await update_user_main_message(self._application.bot, self._application.user_data[telegram_id], telegram_id,
+                                       chat_id, result + "\n\nВыберите следующее действие:", is_logged_in)
+
+
+restart_queue = RestartJobQueue(
+    workers=config.RESTART_WORKERS,
+    max_attempts=config.RESTART_MAX_ATTEMPTS,
+    retry_delay=config.RESTART_RETRY_DELAY,
+    max_retry_delay=config.RESTART_RETRY_MAX_DELAY,
+    retention=config.RESTART_JOB_RETENTION,
+)
+
+metrics.gauge("bot_restart_jobs_running", "Перезапуски, выполняющиеся воркерами очереди", lambda: restart_queue.running)
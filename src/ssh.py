@@ -1,76 +1,662 @@
+import asyncio
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
 import paramiko
 
 from src.config import config
 from src.logger import logger
+from src.metrics import ExecutorLoad, metrics
+from src.tracing import span
 
+SSH_CONNECT_SECONDS = metrics.histogram(
+    "bot_ssh_connect_seconds", "Установка SSH-подключения (с аутентификацией)", ("host",))
+SSH_COMMAND_SECONDS = metrics.histogram(
+    "bot_ssh_command_seconds", "Выполнение команд SSH (query, logoff), включая ожидание пула", ("host", "command"))
+SSH_COMMANDS = metrics.counter(
+    "bot_ssh_commands_total", "Команды SSH по результату (ok, stderr, timeout, error)", ("host", "command", "status"))
 
-async def restart_user_session_on_server(target_username: str) -> str:
+
+class SSHConnectionPool:
     """
-    Подключается по SSH с учёткой бота и завершает сессию пользователя на сервере.
+    Пул SSH-подключений с учёткой бота.
+    Держит аутентифицированные транспорты открытыми (keepalive), проверяет их перед
+    повторным использованием, переподключается при обрыве и ограничивает число соединений.
     """
-    try:
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 max_size: int = 4, keepalive: int = 30, connect_timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_size = max(1, max_size)
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+
+        self._idle: list[paramiko.SSHClient] = []
+        self._opened = 0  # Открытые соединения (в пуле и выданные)
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _connect(self) -> paramiko.SSHClient:
+        """Открывает новое аутентифицированное подключение."""
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        # Подключение
-        ssh.connect(
-            hostname=config.SSH_HOST,
-            port=config.SSH_PORT,
-            username=config.BOT_SSH_USER,
-            password=config.BOT_SSH_PASS
-        )
-        # Выполняем команду поиска сессии
-        _, stdout, stderr = ssh.exec_command(f'query session {target_username}')
-        # Читаем вывод с правильной кодировкой для Windows (cp866 для русского)
-        output = stdout.read().decode('cp866', errors='ignore').strip()
-        # print(output) # Для отладки
-        error = stderr.read().decode('cp866', errors='ignore').strip()
-        # Логируем для отладки (можно убрать)
-        logger.info(f"Вывод query session для {target_username}:\n{output}")
-        if error:
-            logger.warning(f"STDERR для {target_username}:\n{error}")
-        # Проверка на ошибки
-        if error and not output:
-            ssh.close()
-            return f"❌ Ошибка при поиске сессии: {error}"
-        # Проверка, существует ли пользователь
-        if ("Не существуют сеансы для" in output or
-                "Нет пользователя" in output or
-                "The session name is invalid" in output or
-                "not found" in output.lower()):
-            ssh.close()
-            return f"ℹ️ Пользователь '{target_username}' не найден или не активен."
-        # Разбор строк
-        lines = output.split('\n')
-        if len(lines) < 2:
+        with SSH_CONNECT_SECONDS.time(self.host), span("ssh.connect", host=self.host):
+            ssh.connect(
+                hostname=self.host,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                timeout=self.connect_timeout,
+                banner_timeout=self.connect_timeout,
+                auth_timeout=self.connect_timeout,
+            )
+        if self.keepalive > 0:
+            ssh.get_transport().set_keepalive(self.keepalive)
+        logger.info(f"Открыто SSH-подключение к {self.host}:{self.port}")
+        return ssh
+
+    @staticmethod
+    def _is_healthy(ssh: paramiko.SSHClient) -> bool:
+        """Проверяет, что транспорт жив и готов открывать каналы."""
+        transport = ssh.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, ssh: paramiko.SSHClient):
+        try:
             ssh.close()
-            return "❌ Не удалось получить данные о сессии (неполный вывод)."
-        # Берём первую строку с данными о сессии (обычно после заголовка)
-        session_line = ""
-        for line in lines[1:]:
-            line = line.strip()
-            if line and not line.startswith('-'):
-                session_line = line
+        except Exception:
+            pass
+
+    def acquire(self, timeout: float | None = None) -> paramiko.SSHClient:
+        """
+        Выдаёт рабочее подключение из пула или открывает новое, если лимит не исчерпан.
+        Если все подключения заняты, ждёт освобождения (TimeoutError по истечении timeout).
+        Проверка и открытие подключений (сетевой ввод-вывод) выполняются вне блокировки,
+        чтобы медленное или полуоткрытое соединение не задерживало остальные потоки.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("SSH-пул закрыт")
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        break
+                    if self._opened < self.max_size:
+                        self._opened += 1
+                        candidate = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Нет свободных SSH-подключений")
+                    self._cond.wait(remaining)
+
+            if candidate is None:
                 break
-        if not session_line:
-            ssh.close()
-            return "❌ Не удалось найти строку с данными о сессии."
-        # Разделяем по пробелам
-        parts = session_line.split()
-        if len(parts) < 3:
-            ssh.close()
-            return f"❌ Ошибка разбора строки сессии: '{session_line}'"
-        # ID сессии — третий элемент
-        print(parts)
-        session_id = parts[2] #0->1,1->2,2-...
-        # print(parts) # Для отладки
-        # Завершаем сессию
-        _, stdout, stderr = ssh.exec_command(f'logoff {session_id}')
-        logoff_error = stderr.read().decode('cp866', errors='ignore').strip()
-        ssh.close()
-        if logoff_error:
-            return f"❌ Ошибка при завершении сессии: {logoff_error}"
+            if self._is_healthy(candidate):
+                return candidate
+            logger.warning(f"SSH-подключение к {self.host} неактивно, закрываем.")
+            self._discard(candidate)
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, ssh: paramiko.SSHClient, broken: bool = False):
+        """Возвращает подключение в пул (или закрывает его, если оно сломано)."""
+        # Проверка здоровья — сетевой ввод-вывод, поэтому до захвата блокировки
+        keep = not broken and self._is_healthy(ssh)
+        with self._cond:
+            if keep and not self._closed:
+                self._idle.append(ssh)
+                self._cond.notify()
+                return
+            self._opened -= 1
+            self._cond.notify()
+        self._discard(ssh)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """Контекстный менеджер для работы с подключением из пула."""
+        ssh = self.acquire(timeout)
+        try:
+            yield ssh
+        except (paramiko.SSHException, EOFError, OSError):
+            self.release(ssh, broken=True)
+            raise
+        except BaseException:
+            self.release(ssh)
+            raise
         else:
-            return f"✅ Сессия пользователя '{target_username}' (ID: {session_id}) успешно завершена."
+            self.release(ssh)
+
+    def exec_command(self, command: str, timeout: float | None = None) -> tuple[str, str]:
+        """
+        Выполняет команду в новом канале поверх открытого подключения.
+        Возвращает (stdout, stderr) в кодировке cp866. При обрыве соединения
+        один раз переподключается и повторяет команду.
+        timeout ограничивает и ожидание свободного подключения, и чтение канала.
+        """
+        for attempt in range(2):
+            try:
+                with self.connection(timeout) as ssh:
+                    _, stdout, stderr = ssh.exec_command(command, timeout=timeout)
+                    output = stdout.read().decode('cp866', errors='ignore').strip()
+                    error = stderr.read().decode('cp866', errors='ignore').strip()
+                    return output, error
+            except TimeoutError:
+                raise
+            except (paramiko.SSHException, EOFError, OSError) as e:
+                if attempt:
+                    raise
+                logger.warning(f"SSH-подключение оборвалось ({e}), переподключаемся...")
+
+    @property
+    def opened(self) -> int:
+        """Открытые подключения (свободные и выданные)."""
+        return self._opened
+
+    @property
+    def idle(self) -> int:
+        """Свободные подключения в пуле."""
+        return len(self._idle)
+
+    def close(self):
+        """Закрывает все свободные подключения и запрещает выдачу новых."""
+        with self._cond:
+            self._closed = True
+            for ssh in self._idle:
+                self._discard(ssh)
+            self._opened -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+
+@dataclass(frozen=True)
+class SessionRecord:
+    """Строка таблицы `query session`."""
+    name: str  # SESSIONNAME; пустое у отключённых сессий
+    user: str  # USERNAME; пустое у служебных сессий (services, rdp-tcp)
+    id: int
+    state: str  # Active, Disc, Listen... (на русской Windows — «Активно», «Диск» и т.п.)
+
+
+class SessionQueryError(Exception):
+    """Сервер не вернул таблицу сессий."""
+
+
+def parse_session_table(output: str) -> list[SessionRecord]:
+    """
+    Разбирает полный вывод `query session` (qwinsta) в список SessionRecord.
+    Колонки определяются по позициям заголовка, а не по номеру слова, поэтому
+    строки с пустым SESSIONNAME или USERNAME разбираются корректно
+    (заголовок может быть и на русском — важны только позиции).
+    """
+    lines = [line.rstrip() for line in output.splitlines() if line.strip()]
+    if not lines:
+        return []
+    header = [m.start() for m in re.finditer(r'\S+', lines[0])]
+    if len(header) < 3:
+        return []
+    user_col = header[1]
+    records = []
+    for line in lines[1:]:
+        line = ' ' + line[1:] if line.startswith('>') else line  # '>' отмечает текущую сессию
+        name = line[:user_col].strip()
+        # Правая часть: [USERNAME] ID STATE ...; ID выровнен по правому краю и может заходить левее заголовка
+        tokens = line[user_col:].split()
+        id_index = next((i for i, token in enumerate(tokens) if token.isdigit()), None)
+        if id_index is None:
+            continue
+        records.append(SessionRecord(
+            name=name,
+            user=' '.join(tokens[:id_index]),
+            id=int(tokens[id_index]),
+            state=tokens[id_index + 1] if id_index + 1 < len(tokens) else '',
+        ))
+    return records
+
+
+class SessionTableCache:
+    """
+    Короткоживущий снимок таблицы сессий сервера.
+    Серия перезапусков и проверок за ttl секунд использует один вызов `query session`,
+    а одновременные запросы ждут один и тот же вызов.
+    """
+
+    def __init__(self, host: str | None = None, ttl: float = 5.0,
+                 on_update: Callable[[str | None, list[SessionRecord], float], None] | None = None):
+        self.host = host
+        self.ttl = ttl
+        # Вызывается после каждого успешного запроса таблицы (обновление индекса присутствия)
+        self.on_update = on_update
+        self._records: list[SessionRecord] | None = None
+        self._fetched_at = 0.0
+        self._inflight: asyncio.Future | None = None
+        # Пользователи, чьи сессии завершены после начала последнего запроса таблицы: имя -> время logoff
+        self._forgotten: dict[str, float] = {}
+
+    async def get(self, max_age: float | None = None) -> list[SessionRecord]:
+        """
+        Возвращает снимок таблицы сессий, при необходимости запрашивая сервер.
+        max_age заменяет ttl для этого вызова (0 — всегда свежий запрос).
+        """
+        max_age = self.ttl if max_age is None else max_age
+        if self._records is not None and time.monotonic() - self._fetched_at < max_age:
+            return self._records
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, future: asyncio.Future):
+        if self._inflight is future:
+            self._inflight = None
+        if not future.cancelled():
+            future.exception()  # Ошибку получают ожидающие, не логируем «never retrieved»
+
+    async def _fetch(self) -> list[SessionRecord]:
+        started = time.monotonic()
+        output, error = await run_ssh_command('query session', host=self.host)
+        if error and not output:
+            raise SessionQueryError(error.strip())
+        records = parse_session_table(output)
+        # Таблица, запрошенная до logoff, может ещё содержать завершённую сессию
+        self._forgotten = {user: at for user, at in self._forgotten.items() if at >= started}
+        if self._forgotten:
+            records = [record for record in records if record.user.lower() not in self._forgotten]
+        self._records, self._fetched_at = records, time.monotonic()
+        logger.debug(f"Таблица сессий {self.host} обновлена: {len(records)} записей")
+        if self.on_update is not None:
+            self.on_update(self.host, records, self._fetched_at)
+        return records
+
+    async def find(self, username: str) -> list[SessionRecord]:
+        """
+        Сессии пользователя (без учёта регистра). Для пользователя, сессия которого завершена
+        после снимка, таблица запрашивается заново: он мог уже переподключиться с новым ID.
+        """
+        username = username.lower()
+        records = await self.get(max_age=0 if username in self._forgotten else None)
+        return [record for record in records if record.user.lower() == username]
+
+    def forget(self, username: str):
+        """
+        Убирает сессии пользователя из снимка после logoff. Остальные записи снимка остаются
+        верными, поэтому серия перезапусков обходится одним `query session` за ttl.
+        """
+        username = username.lower()
+        self._forgotten[username] = time.monotonic()
+        if self._records is not None:
+            self._records = [record for record in self._records if record.user.lower() != username]
+
+    def invalidate(self):
+        """Сбрасывает снимок (результат logoff неизвестен)."""
+        self._records = None
+
+
+class SessionPresenceIndex:
+    """
+    Индекс присутствия: пользователь -> (сервер, сессия) по последним снимкам всех серверов.
+    Наполняется каждым запросом таблицы сессий (фоновым опросом и живыми запросами);
+    записи сервера, снимок которого старше max_age, считаются устаревшими.
+    Индекс только подсказывает, на каком сервере искать пользователя: ID сессии из него
+    для logoff не используется (он мог достаться другому пользователю).
+    """
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        # Сервер -> (время снимка, записи)
+        self._snapshots: dict[str | None, tuple[float, list[SessionRecord]]] = {}
+        self._index: dict[str, tuple[str | None, SessionRecord]] = {}
+
+    def update(self, host: str | None, records: list[SessionRecord], fetched_at: float):
+        """Принимает свежий снимок сервера и пересобирает индекс (подмена словаря целиком)."""
+        self._snapshots[host] = (fetched_at, records)
+        index = {}
+        for name, (_, host_records) in self._snapshots.items():
+            for record in host_records:
+                if record.user:
+                    index.setdefault(record.user.lower(), (name, record))
+        self._index = index
+
+    def lookup(self, username: str) -> tuple[str | None, SessionRecord] | None:
+        """(сервер, сессия) из индекса или None, если записи нет или снимок её сервера устарел."""
+        entry = self._index.get(username.lower())
+        if entry is None:
+            return None
+        fetched_at, _ = self._snapshots.get(entry[0], (0.0, None))
+        if time.monotonic() - fetched_at >= self.max_age:
+            return None
+        return entry
+
+    def discard(self, username: str):
+        """
+        Убирает пользователя из индекса (после logoff его сессии больше нет).
+        Записи удаляются и из снимков серверов, иначе следующая пересборка индекса вернула бы их.
+        """
+        username = username.lower()
+        for host, (fetched_at, records) in list(self._snapshots.items()):
+            kept = [record for record in records if record.user.lower() != username]
+            if len(kept) != len(records):
+                self._snapshots[host] = (fetched_at, kept)
+        self._index.pop(username, None)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class SSHHost:
+    """Сервер сессий: собственный пул SSH-подключений и снимок таблицы сессий."""
+
+    def __init__(self, name: str, pool: SSHConnectionPool, snapshot_ttl: float = 5.0):
+        self.name = name
+        self.pool = pool
+        self.sessions = SessionTableCache(name, ttl=snapshot_ttl)
+
+
+class HostRegistry:
+    """Реестр серверов сессий. Первый добавленный сервер используется по умолчанию."""
+
+    def __init__(self, presence_max_age: float = 60.0):
+        self._hosts: dict[str, SSHHost] = {}
+        self.presence = SessionPresenceIndex(max_age=presence_max_age)
+
+    @classmethod
+    def from_config(cls) -> 'HostRegistry':
+        registry = cls(presence_max_age=config.PRESENCE_MAX_AGE)
+        for name, address, port in config.SSH_HOSTS:
+            registry.add(SSHHost(name, SSHConnectionPool(
+                host=address,
+                port=port,
+                username=config.BOT_SSH_USER,
+                password=config.BOT_SSH_PASS,
+                max_size=config.SSH_POOL_SIZE,
+                keepalive=config.SSH_KEEPALIVE,
+                connect_timeout=config.SSH_CONNECT_TIMEOUT,
+            ), snapshot_ttl=config.SESSION_SNAPSHOT_TTL))
+        return registry
+
+    def add(self, host: SSHHost):
+        host.sessions.on_update = self.presence.update
+        self._hosts[host.name] = host
+
+    def get(self, name: str | None = None) -> SSHHost:
+        """Сервер по имени (KeyError, если такого нет) или сервер по умолчанию."""
+        if name is None:
+            return next(iter(self._hosts.values()))
+        return self._hosts[name]
+
+    def __iter__(self):
+        return iter(list(self._hosts.values()))
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+    async def find_session(self, username: str) -> tuple[SSHHost, SessionRecord] | None:
+        """
+        Ищет сессию пользователя сразу на всех серверах; побеждает первый найденный.
+        Если ответа нет ни от одного сервера, пробрасывает первую ошибку.
+        """
+        hosts = list(self)
+        if len(hosts) == 1:
+            sessions = await hosts[0].sessions.find(username)
+            return (hosts[0], sessions[0]) if sessions else None
+
+        async def find_on(host: SSHHost):
+            sessions = await host.sessions.find(username)
+            return (host, sessions[0]) if sessions else None
+
+        tasks = [asyncio.ensure_future(find_on(host)) for host in hosts]
+        errors = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    found = await next_done
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if found is not None:
+                    return found
+        finally:
+            # Снимки остальных серверов всё равно дозапрашиваются (get ждёт через shield) и прогревают кеш
+            for task in tasks:
+                task.cancel()
+        if len(errors) == len(tasks):
+            raise errors[0]
+        for error in errors:
+            logger.warning(f"Сервер не ответил при поиске сессии {username}: {error!r}")
+        return None
+
+    def lookup_indexed(self, username: str) -> tuple[SSHHost, SessionRecord] | None:
+        """Сервер пользователя (и его последняя известная сессия) из индекса присутствия, без запросов к серверам."""
+        entry = self.presence.lookup(username)
+        if entry is None or entry[0] not in self._hosts:
+            return None
+        return self._hosts[entry[0]], entry[1]
+
+    async def run_presence_poller(self, interval: float = 30.0):
+        """Фоновая задача: периодически снимает таблицы сессий всех серверов для индекса присутствия."""
+        while True:
+            host_list = list(self)
+            results = await asyncio.gather(*(host.sessions.get(max_age=0) for host in host_list),
+                                           return_exceptions=True)
+            for host, result in zip(host_list, results):
+                if isinstance(result, BaseException):
+                    logger.warning(f"Не удалось обновить таблицу сессий {host.name}: {result!r}")
+            await asyncio.sleep(interval)
+
+    def close(self):
+        for host in self:
+            host.pool.close()
+
+
+hosts = HostRegistry.from_config()
+
+# Отдельный ограниченный пул потоков для блокирующих операций paramiko,
+# чтобы SSH не занимал executor по умолчанию (SSH_WORKERS потоков на сервер)
+_ssh_executor = ThreadPoolExecutor(max_workers=max(1, config.SSH_WORKERS * max(1, len(hosts))),
+                                   thread_name_prefix="ssh")
+_ssh_load = ExecutorLoad()
+
+metrics.gauge("bot_ssh_pool_connections", "Подключения в SSH-пулах: открытые и свободные",
+              lambda: {(host.name, state): value for host in hosts
+                       for state, value in (("open", host.pool.opened), ("idle", host.pool.idle))},
+              ("host", "state"))
+metrics.gauge("bot_ssh_queue_depth", "Операции SSH в очереди и выполняющиеся", lambda: _ssh_load.pending)
+metrics.gauge("bot_presence_index_users", "Пользователи в индексе присутствия", lambda: len(hosts.presence))
+
+
+async def run_ssh_command(command: str, timeout: float | None = None, host: str | None = None) -> tuple[str, str]:
+    """
+    Асинхронно выполняет команду на сервере host (по умолчанию — первом), не блокируя цикл событий.
+    Возвращает (stdout, stderr); по истечении timeout выбрасывает asyncio.TimeoutError.
+    """
+    timeout = config.SSH_COMMAND_TIMEOUT if timeout is None else timeout
+    target = hosts.get(host)
+    name = command.split(maxsplit=1)[0] if command.strip() else ""
+    status = "error"
+    started = time.perf_counter()
+    try:
+        with span("ssh." + name, host=target.name):
+            # Контекст копируется в поток SSH, чтобы подключение попало в трассу обновления
+            output, error = await asyncio.wait_for(
+                asyncio.wrap_future(_ssh_load.submit(_ssh_executor, contextvars.copy_context().run,
+                                                     target.pool.exec_command, command, timeout)),
+                timeout
+            )
+        status = "stderr" if error else "ok"
+        return output, error
+    except (asyncio.TimeoutError, TimeoutError):
+        status = "timeout"
+        raise
+    finally:
+        SSH_COMMAND_SECONDS.observe(time.perf_counter() - started, target.name, name)
+        SSH_COMMANDS.inc(target.name, name, status)
+
+
+def close_ssh():
+    """Останавливает пул потоков SSH и закрывает подключения ко всем серверам."""
+    _ssh_executor.shutdown(wait=False, cancel_futures=True)
+    hosts.close()
+
+
+async def logoff_user_session(target_username: str) -> str:
+    """
+    Завершает сессию пользователя через подключение из пула SSH того сервера, где она найдена.
+    Индекс присутствия только подсказывает сервер: ID сессии всегда берётся из таблицы сессий
+    этого сервера (снимок не старше SESSION_SNAPSHOT_TTL), иначе ID, освободившийся после выхода
+    пользователя и выданный другому, завершил бы чужую сессию. Если на подсказанном сервере
+    пользователя нет, опрашиваются все серверы (одновременно).
+    Возвращает текст результата; ошибки SSH и поиска сессии пробрасываются
+    (их можно повторить — см. restart_error_text).
+    """
+    found = None
+    indexed = hosts.lookup_indexed(target_username)
+    if indexed is not None:
+        host = indexed[0]
+        sessions = await host.sessions.find(target_username)
+        if sessions:
+            found = host, sessions[0]
+    if found is None:
+        found = await hosts.find_session(target_username)
+    if found is None:
+        return f"ℹ️ Пользователь '{target_username}' не найден или не активен."
+    host, session = found
+    where = f" на {host.name}" if len(hosts) > 1 else ""
+    # Завершаем сессию. Пользователь убирается из снимка и индекса и при ошибке (например, таймауте),
+    # чтобы повторная попытка не взяла тот же устаревший ID; остальные записи снимка остаются
+    # (массовый перезапуск через очередь обходится одним query session на сервер)
+    try:
+        _, logoff_error = await run_ssh_command(f'logoff {session.id}', host=host.name)
+    except BaseException:
+        host.sessions.invalidate()
+        raise
+    finally:
+        host.sessions.forget(target_username)
+        hosts.presence.discard(target_username)
+    if logoff_error:
+        host.sessions.invalidate()
+        return f"❌ Ошибка при завершении сессии: {logoff_error}"
+    else:
+        return f"✅ Сессия пользователя '{target_username}' (ID: {session.id}{where}) успешно завершена."
+
+
+def restart_error_text(target_username: str, error: Exception) -> str:
+    """Текст для пользователя об ошибке перезапуска (с записью в лог)."""
+    if isinstance(error, SessionQueryError):
+        return f"❌ Ошибка при поиске сессии: {error}"
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        logger.error(f"Таймаут SSH при перезапуске сессии {target_username}")
+        return "❌ Сервер не ответил вовремя. Попробуйте позже."
+    logger.error(f"Ошибка SSH: {error}")
+    return f"❌ Произошла ошибка: {str(error)}"
+
+
+async def restart_user_session_on_server(target_username: str) -> str:
+    """Завершает сессию пользователя (logoff_user_session); ошибки возвращаются текстом."""
+    try:
+        return await logoff_user_session(target_username)
     except Exception as e:
-        logger.error(f"Ошибка SSH: {e}")
-        return f"❌ Произошла ошибка: {str(e)}"
\ No newline at end of file
+        return restart_error_text(target_username, e)
+
+
+async def restart_user_sessions(usernames: list[str], parallelism: int = config.RESTART_PARALLELISM,
+                                on_progress: Callable[[dict[str, str]], Awaitable[None]] | None = None
+                                ) -> dict[str, str]:
+    """
+    Массовый перезапуск: ID сессий берутся из снимков таблиц сессий (по одному на сервер,
+    серверы опрашиваются одновременно). Индекс присутствия только подсказывает, какие серверы
+    запросить первыми; остальные опрашиваются, если кого-то там не нашлось.
+    Затем logoff выполняется параллельно (не больше parallelism одновременно).
+    Возвращает {пользователь: результат}; on_progress вызывается с промежуточными результатами.
+    """
+    results: dict[str, str] = {}
+    host_list = list(hosts)
+    sessions: dict[str, tuple[SSHHost, int]] = {}
+    errors = []
+    queried: set[str] = set()
+
+    async def collect(targets: list[SSHHost]):
+        snapshots = await asyncio.gather(*(host.sessions.get() for host in targets), return_exceptions=True)
+        for host, records in zip(targets, snapshots):
+            queried.add(host.name)
+            if isinstance(records, BaseException):
+                logger.error(f"Не удалось получить таблицу сессий {host.name}: {records!r}")
+                errors.append(records)
+                continue
+            for record in records:
+                if record.user:
+                    sessions.setdefault(record.user.lower(), (host, record.id))
+
+    hinted = {found[0].name for user in usernames if (found := hosts.lookup_indexed(user)) is not None}
+    await collect([host for host in host_list if host.name in hinted])
+    if any(user.lower() not in sessions for user in usernames):
+        await collect([host for host in host_list if host.name not in queried])
+    missing = [user for user in usernames if user.lower() not in sessions]
+    # Пользователь не найден: сессии нет или ни один сервер не ответил
+    not_found = "ℹ️ сессия не найдена"
+    if missing and len(errors) == len(host_list):
+        error = errors[0]
+        if isinstance(error, SessionQueryError):
+            not_found = f"❌ Ошибка при поиске сессии: {error}"
+        elif isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            not_found = "❌ Сервер не ответил вовремя."
+        else:
+            not_found = f"❌ Ошибка: {error}"
+
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+    touched: set[str] = set()
+
+    async def logoff(user: str, host: SSHHost, session_id: int):
+        where = f", {host.name}" if len(host_list) > 1 else ""
+        async with semaphore:
+            try:
+                _, logoff_error = await run_ssh_command(f'logoff {session_id}', host=host.name)
+                results[user] = f"❌ {logoff_error.strip()}" if logoff_error \
+                    else f"✅ завершена (ID: {session_id}{where})"
+            except (asyncio.TimeoutError, TimeoutError):
+                results[user] = "❌ сервер не ответил вовремя"
+            except Exception as e:
+                results[user] = f"❌ {e}"
+        if on_progress is not None:
+            await on_progress(results)
+
+    tasks = []
+    for user in usernames:
+        found = sessions.get(user.lower())
+        if found is None:
+            results[user] = not_found
+        else:
+            touched.add(found[0].name)
+            tasks.append(logoff(user, *found))
+    await asyncio.gather(*tasks)
+    for name in touched:
+        hosts.get(name).sessions.invalidate()
+    for user in usernames:
+        hosts.presence.discard(user)
+    logger.info(f"Массовый перезапуск: logoff для {len(tasks)} сессий из {len(usernames)} запрошенных пользователей")
+    return results
@@ -0,0 +1,99 @@
+"""
+Сводка по файлам трасс (TRACE_FILE): p50/p95/p99 длительности для каждого спана.
+Не зависит от конфигурации бота — можно запускать на копии файлов где угодно.
+
+Запуск: python -m src.trace_report traces.jsonl [traces.jsonl.1 ...] [--kind /restart] [--top 5]
+"""
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортирован)."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def read_traces(paths: list[str], kind: str | None = None):
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line_no, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    trace = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"{path}:{line_no}: строка повреждена, пропущена", file=sys.stderr)
+                    continue
+                if kind is None or trace.get("kind") == kind:
+                    yield trace
+
+
+def summarize(traces) -> tuple[dict[str, list[float]], dict[str, int], list[dict]]:
+    """
+    Длительности по спанам ('update' — обновление целиком, 'update <вид>' — по видам),
+    число ошибок по спанам и сами трассы.
+    """
+    durations: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    collected = []
+    for trace in traces:
+        collected.append(trace)
+        durations["update"].append(trace["duration_ms"])
+        durations[f"update {trace.get('kind', '?')}"].append(trace["duration_ms"])
+        for span in trace.get("spans", ()):
+            durations[span["name"]].append(span["duration_ms"])
+            if "error" in span:
+                errors[span["name"]] += 1
+    for values in durations.values():
+        values.sort()
+    return durations, errors, collected
+
+
+def format_table(durations: dict[str, list[float]], errors: dict[str, int]) -> str:
+    width = max([len(name) for name in durations] + [4])
+    lines = [f"{'span':<{width}} {'count':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    # Сначала обновления целиком, затем спаны по убыванию суммарного времени
+    names = sorted(durations, key=lambda name: (not name.startswith("update"), -sum(durations[name])))
+    for name in names:
+        values = durations[name]
+        lines.append(f"{name:<{width}} {len(values):>7} {errors.get(name, 0):>6} {percentile(values, 50):>9.1f} "
+                     f"{percentile(values, 95):>9.1f} {percentile(values, 99):>9.1f} {values[-1]:>9.1f}")
+    return "\n".join(lines)
+
+
+def format_slowest(traces: list[dict], top: int) -> str:
+    lines = []
+    for trace in sorted(traces, key=lambda t: t["duration_ms"], reverse=True)[:top]:
+        lines.append(f"{trace['trace_id']} {trace.get('kind', '?')} user={trace.get('user_id')} "
+                     f"{trace['duration_ms']:.1f} мс")
+        for span in sorted(trace.get("spans", ()), key=lambda s: s["start_ms"]):
+            error = f" [{span['error']}]" if "error" in span else ""
+            lines.append(f"    +{span['start_ms']:>9.1f} {span['duration_ms']:>9.1f} мс  {span['name']}{error}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Перцентили длительности спанов из файлов трасс бота")
+    parser.add_argument("files", nargs="+", help="файлы трасс (включая ротированные .1, .2 ...)")
+    parser.add_argument("--kind", help="только обновления этого вида, например /restart или button:login")
+    parser.add_argument("--top", type=int, default=0, help="показать N самых медленных трасс по спанам")
+    args = parser.parse_args(argv)
+
+    durations, errors, traces = summarize(read_traces(args.files, args.kind))
+    if not traces:
+        print("Трассы не найдены.")
+        return 1
+    print(format_table(durations, errors))
+    if args.top > 0:
+        print()
+        print(format_slowest(traces, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
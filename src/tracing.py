@@ -0,0 +1,165 @@
+"""
+Трассировка обработки обновлений (включается параметром TRACE_FILE).
+Каждое обновление получает trace_id, а участки работы — запросы к БД, команды
+SSH, вызовы Bot API, обработчики — записываются в него как спаны с длительностью.
+Готовая трасса пишется одной строкой JSON в ротируемый файл (запись идёт в
+отдельном потоке); сводка по перцентилям: python -m src.trace_report <файл>.
+"""
+import contextvars
+import json
+import logging
+import queue
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueListener, RotatingFileHandler
+
+from telegram import Update
+from telegram.ext import ContextTypes, TypeHandler
+from telegram.request import HTTPXRequest
+
+from src.logger import logger
+
+
+class Trace:
+    """Трасса одного обновления: описание и список спанов."""
+    __slots__ = ("trace_id", "update_id", "user_id", "kind", "started", "started_at", "spans")
+
+    def __init__(self, update: Update):
+        self.trace_id = secrets.token_hex(8)
+        self.update_id = update.update_id
+        self.user_id = update.effective_user.id if update.effective_user else None
+        self.kind = _describe(update)
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: list[dict] = []
+
+    def add(self, name: str, started: float, finished: float, error: str | None = None, attrs: dict | None = None):
+        # list.append атомарен — спаны можно добавлять и из потоков SSH
+        record = {
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "duration_ms": round((finished - started) * 1000, 3),
+        }
+        if error:
+            record["error"] = error
+        if attrs:
+            record.update(attrs)
+        self.spans.append(record)
+
+    def to_dict(self, finished: float) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "update_id": self.update_id,
+            "user_id": self.user_id,
+            "kind": self.kind,
+            "ts": round(self.started_at, 3),
+            "duration_ms": round((finished - self.started) * 1000, 3),
+            "spans": self.spans,
+        }
+
+
+def _describe(update: Update) -> str:
+    """Вид обновления без идентификаторов: '/restart', 'button:approve_N', 'message'."""
+    if update.callback_query is not None:
+        return "button:" + re.sub(r"\d+", "N", update.callback_query.data or "")
+    message = update.effective_message
+    if message is not None and message.text and message.text.startswith("/"):
+        return message.text.split(maxsplit=1)[0].split("@")[0]
+    return "message" if message is not None else "other"
+
+
+_current: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("trace", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Записывает блок как спан текущей трассы; вне трассы ничего не делает."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        trace.add(name, started, time.perf_counter(), error, attrs)
+
+
+class Tracer:
+    """Начинает и завершает трассы обновлений и пишет их в JSONL с ротацией."""
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue | None = None
+        self._listener: QueueListener | None = None
+        self._handler: RotatingFileHandler | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._listener is not None
+
+    def open(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        """Открывает файл трасс; запись в файл выполняется в отдельном потоке."""
+        if self.enabled:
+            return
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, self._handler)
+        self._listener.start()
+        logger.info(f"Трассировка обновлений включена: {path}")
+
+    def start(self, update: Update) -> Trace | None:
+        if not self.enabled:
+            return None
+        trace = Trace(update)
+        _current.set(trace)
+        return trace
+
+    def finish(self):
+        trace = _current.get()
+        if trace is None:
+            return
+        _current.set(None)
+        if self.enabled:
+            line = json.dumps(trace.to_dict(time.perf_counter()), ensure_ascii=False)
+            self._queue.put(logging.makeLogRecord({"msg": line, "levelno": logging.INFO, "levelname": "INFO"}))
+
+    def close(self):
+        """Дописывает очередь трасс и закрывает файл."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._handler.close()
+            self._listener = self._handler = self._queue = None
+
+
+tracer = Tracer()
+
+
+class TracingRequest(HTTPXRequest):
+    """HTTPXRequest, записывающий каждый вызов Bot API как спан 'tg.<метод>'."""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> tuple[int, bytes]:
+        with span("tg." + url.rsplit("/", 1)[-1]):
+            return await super().do_request(url, method, *args, **kwargs)
+
+
+async def begin_trace(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tracer.start(update)
+
+
+async def end_trace(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tracer.finish()
+
+
+# Трасса охватывает все группы обработчиков: начинается до промежуточного обработчика сессии
+# (группа -1) и завершается после обработчиков команд и кнопок (группа 0)
+trace_begin_handler = TypeHandler(Update, begin_trace)
+trace_end_handler = TypeHandler(Update, end_trace)
+TRACE_BEGIN_GROUP = -2
+TRACE_END_GROUP = 1000
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any, Awaitable
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from src.logger import logger
+
+
+class _UserLock:
+    """Замок пользователя и число обновлений, которые его держат или ждут."""
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обрабатывает обновления разных пользователей одновременно, а обновления
+    одного пользователя — строго по очереди (context.user_data, основное
+    сообщение и строка сессии не гоняются между собой).
+
+    Общий лимит max_running ограничивает число одновременно выполняемых
+    обработчиков. Он берётся уже после замка пользователя, поэтому очередь
+    одного пользователя не занимает места, нужные другим.
+    max_pending — сколько обновлений может ждать и выполняться всего
+    (семафор базового класса).
+    """
+
+    def __init__(self, max_running: int = 16, max_pending: int = 1024):
+        super().__init__(max_concurrent_updates=max(max_pending, max_running, 2))
+        self.max_running = max(1, max_running)
+        self._running = asyncio.BoundedSemaphore(self.max_running)
+        self._locks: dict[int, _UserLock] = {}
+        self.running = 0  # Обработчики, выполняющиеся сейчас
+
+    @staticmethod
+    def _key(update: object) -> int | None:
+        if isinstance(update, Update):
+            if update.effective_user is not None:
+                return update.effective_user.id
+            if update.effective_chat is not None:
+                return update.effective_chat.id
+        return None
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        async with self._running:
+            self.running += 1
+            try:
+                await coroutine
+            finally:
+                self.running -= 1
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+        if key is None:
+            # Обновления без пользователя и чата не требуют упорядочивания
+            await self._run(coroutine)
+            return
+        await self.run_for_user(key, coroutine)
+
+    async def run_for_user(self, key: int, coroutine: Awaitable[Any]) -> None:
+        """
+        Выполняет coroutine в очереди пользователя key (Telegram ID), как его обновление.
+        Нужен фоновым задачам, которые меняют user_data или основное сообщение пользователя.
+        """
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = _UserLock()
+        entry.users += 1
+        try:
+            # asyncio.Lock пропускает ожидающих в порядке прихода — порядок обновлений сохраняется
+            async with entry.lock:
+                await self._run(coroutine)
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._locks[key]
+
+    async def initialize(self) -> None:
+        logger.info(f"Параллельная обработка обновлений: до {self.max_running} одновременно, "
+                    f"по очереди для каждого пользователя")
+
+    async def shutdown(self) -> None:
+        self._locks.clear()
+
+    @property
+    def waiting_users(self) -> int:
+        """Число пользователей, у которых есть обрабатываемые или ожидающие обновления."""
+        return len(self._locks)